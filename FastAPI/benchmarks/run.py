@@ -0,0 +1,362 @@
+"""
+Benchmark suite for the API and service hot paths.
+
+Seeds a SQLite database with a configurable number of transactions and
+categories, then measures latency percentiles and throughput for listing
+(deep offset vs keyset pagination, filtered), description search, aggregate
+reports, CSV/PDF export and bulk writes, both through TransactionService and through the
+HTTP app. Results are written as JSON so runs can be compared over time.
+
+Usage (from the FastAPI folder):
+    python -m benchmarks.run --transactions 10000
+    python -m benchmarks.run --transactions 1000000 --categories 500 --reuse
+    python -m benchmarks.run --compare benchmarks/results/previous.json
+
+Bulk write scenarios add rows dated after the seeded range; with --reuse they
+accumulate in the database between runs.
+"""
+
+import argparse
+import io
+import json
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, List, Optional
+
+BENCH_DIR = Path(__file__).resolve().parent
+APP_DIR = BENCH_DIR.parent
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from config import settings  # noqa: E402
+from database import Base, build_engine, get_db  # noqa: E402
+from main import app  # noqa: E402
+from models import EPOCH  # noqa: E402
+from schemas import TransactionBatchRequest, TransactionCreate  # noqa: E402
+from services.import_service import ImportService  # noqa: E402
+from services.report_service import iter_csv_chunks, write_pdf  # noqa: E402
+from services.rollup_service import RollupService  # noqa: E402
+from services.transaction_service import TransactionService  # noqa: E402
+
+FIRST_DAY = date(2023, 1, 1)
+SEED_CHUNK = 50000
+
+
+def seed_database(path: Path, transactions: int, categories: int, days: int, seed: int) -> None:
+    """Create the schema and bulk insert synthetic categories and transactions."""
+    engine = build_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    engine.dispose()
+
+    rng = random.Random(seed)
+    first_day = (FIRST_DAY - EPOCH).days
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=OFF")
+        conn.executemany(
+            "INSERT INTO categories (id, name, description, is_income, is_default) VALUES (?, ?, NULL, ?, 0)",
+            [(i, f"Category {i:04d}", i % 5 == 0) for i in range(1, categories + 1)]
+        )
+        words = ["coffee", "rent", "salary", "groceries", "fuel", "gym", "books", "dinner", "refund", "gift"]
+        for start in range(0, transactions, SEED_CHUNK):
+            rows = []
+            for _ in range(min(SEED_CHUNK, transactions - start)):
+                category_id = rng.randint(1, categories)
+                rows.append((
+                    rng.randint(100, 500000),  # cents
+                    category_id,
+                    f"{rng.choice(words)} {rng.choice(words)} #{rng.randint(1, 9999)}",
+                    category_id % 5 == 0,
+                    first_day + rng.randrange(days),
+                ))
+            conn.executemany(
+                "INSERT INTO transactions (amount, category_id, description, is_income, date) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            conn.commit()
+    finally:
+        conn.close()
+
+    engine = build_engine(f"sqlite:///{path}")
+    db = sessionmaker(bind=engine)()
+    try:
+        RollupService.rebuild(db)
+        db.commit()
+    finally:
+        db.close()
+        engine.dispose()
+
+
+def count_transactions(path: Path) -> int:
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    index = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+def measure(name: str, layer: str, fn: Callable[[], object], iterations: int, warmup: int) -> dict:
+    """Run fn repeatedly and summarise its latency in milliseconds."""
+    for _ in range(warmup):
+        fn()
+    timings = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - t0) * 1000)
+    elapsed = time.perf_counter() - started
+    timings.sort()
+    result = {
+        'name': name,
+        'layer': layer,
+        'iterations': iterations,
+        'mean_ms': round(statistics.fmean(timings), 3),
+        'p50_ms': round(percentile(timings, 0.50), 3),
+        'p95_ms': round(percentile(timings, 0.95), 3),
+        'p99_ms': round(percentile(timings, 0.99), 3),
+        'max_ms': round(timings[-1], 3),
+        'ops_per_s': round(iterations / elapsed, 2) if elapsed else None,
+    }
+    print(f"  {layer:8} {name:32} p50 {result['p50_ms']:10.2f} ms  p95 {result['p95_ms']:10.2f} ms", flush=True)
+    return result
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=APP_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(args) -> dict:
+    """Seed (or reuse) the benchmark database, run every scenario and return the results document."""
+    db_path = Path(args.db)
+    if not (args.reuse and db_path.exists() and count_transactions(db_path) >= args.transactions):
+        for suffix in ("", "-wal", "-shm"):
+            Path(f"{db_path}{suffix}").unlink(missing_ok=True)
+        print(f"Seeding {args.transactions} transactions / {args.categories} categories into {db_path}", flush=True)
+        t0 = time.perf_counter()
+        seed_database(db_path, args.transactions, args.categories, args.days, args.seed)
+        print(f"  seeded in {time.perf_counter() - t0:.1f}s", flush=True)
+    total = count_transactions(db_path)
+
+    engine = build_engine(f"sqlite:///{db_path}")
+    Session = sessionmaker(bind=engine)
+    db = Session()
+
+    def override_get_db():
+        session = Session()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    # Fresh report cache so exports are rendered, not served from earlier runs
+    cache_dir = Path(tempfile.mkdtemp(prefix="bench-report-cache-"))
+    settings.report_cache_dir = str(cache_dir)
+
+    def clear_report_cache():
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    # Startup events are skipped on purpose: they would create/seed the configured app database
+    app.dependency_overrides[get_db] = override_get_db
+    client = TestClient(app)
+
+    rng = random.Random(args.seed + 1)
+    last_day = FIRST_DAY + timedelta(days=args.days - 1)
+    export_start = (last_day - timedelta(days=args.export_days - 1)).isoformat()
+    export_end = last_day.isoformat()
+    month_start = (last_day - timedelta(days=29)).isoformat()
+    deep_skip = max(0, int(total * 0.9) - args.page_size)
+    deep_after_id = TransactionService.get_transaction_rows(db, skip=deep_skip, limit=1)[0][0] + 1
+    cursor = TransactionService.encode_cursor(deep_after_id)
+    filters = dict(is_income=False, category_id=2, start_date=month_start, end_date=export_end)
+    # Bulk writes land after the seeded range so they don't grow the export/report ranges
+    write_date = (last_day + timedelta(days=1)).isoformat()
+
+    def new_transactions(n: int) -> List[TransactionCreate]:
+        return [
+            TransactionCreate(
+                amount=rng.randint(100, 100000) / 100,
+                category_id=rng.randint(1, args.categories),
+                description="bench write",
+                is_income=False,
+                date=write_date,
+            )
+            for _ in range(n)
+        ]
+
+    def csv_upload(n: int) -> bytes:
+        lines = ["amount,category_id,description,is_income,date"]
+        lines += [f"{rng.randint(100, 100000) / 100},{rng.randint(1, args.categories)},bench import,false,{write_date}"
+                  for _ in range(n)]
+        return ("\n".join(lines) + "\n").encode()
+
+    def consume_csv():
+        for _ in iter_csv_chunks(db, export_start, export_end):
+            pass
+
+    def http(method: str, url: str, **kwargs):
+        def call():
+            response = client.request(method, url, **kwargs)
+            response.raise_for_status()
+            return response
+        return call
+
+    def http_export(file_type: str):
+        call = http("GET", f"/transactions/reports/download?file_type={file_type}"
+                           f"&start_date={export_start}&end_date={export_end}")
+
+        def run():
+            clear_report_cache()
+            return call()
+        return run
+
+    scenarios = [
+        ("list_first_page", "service", lambda: TransactionService.get_transaction_rows(db, limit=args.page_size)),
+        ("list_deep_offset", "service",
+         lambda: TransactionService.get_transaction_rows(db, skip=deep_skip, limit=args.page_size)),
+        ("list_deep_cursor", "service",
+         lambda: TransactionService.get_transaction_rows(db, limit=args.page_size, after_id=deep_after_id)),
+        ("list_filtered", "service", lambda: TransactionService.get_transaction_rows(db, limit=args.page_size, **filters)),
+        ("search_selective", "service",
+         lambda: TransactionService.search_transaction_rows(db, "coffee 4242", limit=args.page_size)),
+        ("search_common", "service", lambda: TransactionService.search_transaction_rows(db, "coffee", limit=args.page_size)),
+        ("report_totals_all", "service", lambda: TransactionService.get_report_totals(db)),
+        ("report_totals_month", "service", lambda: TransactionService.get_report_totals(db, month_start, export_end)),
+        ("report_grouped_month", "service", lambda: TransactionService.get_grouped_totals(db, "month")),
+        ("report_grouped_category", "service", lambda: TransactionService.get_grouped_totals(db, "category")),
+        ("balance_series_day", "service", lambda: TransactionService.get_balance_series(db, "day")),
+        ("export_csv", "service", consume_csv),
+        ("export_pdf", "service", lambda: write_pdf(db, export_start, export_end, io.BytesIO())),
+        ("batch_create", "service", lambda: TransactionService.apply_batch(
+            db, TransactionBatchRequest(create=new_transactions(args.batch_size)))),
+        ("import_csv", "service", lambda: ImportService.import_transactions(
+            db, ImportService.iter_records(io.BytesIO(csv_upload(args.batch_size)), "csv"))),
+
+        ("list_first_page", "http", http("GET", f"/transactions/?limit={args.page_size}")),
+        ("list_deep_offset", "http", http("GET", f"/transactions/?limit={args.page_size}&skip={deep_skip}")),
+        ("list_deep_cursor", "http", http("GET", f"/transactions/?limit={args.page_size}&cursor={cursor}")),
+        ("list_filtered", "http", http(
+            "GET", f"/transactions/?limit={args.page_size}&is_income=false&category_id=2"
+                   f"&start_date={month_start}&end_date={export_end}")),
+        ("search_selective", "http", http("GET", f"/transactions/search?q=coffee+4242&limit={args.page_size}")),
+        ("report_totals_all", "http", http("GET", "/transactions/reports/aggregate")),
+        ("report_grouped_month", "http", http("GET", "/transactions/reports/grouped?group_by=month")),
+        ("balance_series_day", "http", http("GET", "/transactions/reports/balance?period=day")),
+        ("export_csv", "http", http_export("csv")),
+        ("export_pdf", "http", http_export("pdf")),
+        ("batch_create", "http", lambda: http("POST", "/transactions/batch", json={
+            "create": [t.model_dump() for t in new_transactions(args.batch_size)]})()),
+        ("import_csv", "http", lambda: http("POST", "/transactions/import?format=csv", files={
+            "file": ("bench.csv", csv_upload(args.batch_size), "text/csv")})()),
+    ]
+    only = set(args.only or [])
+
+    print(f"Running benchmarks ({args.iterations} iterations, {args.warmup} warmup)", flush=True)
+    results = []
+    try:
+        for name, layer, fn in scenarios:
+            if only and name not in only and f"{layer}:{name}" not in only:
+                continue
+            if args.layer != "all" and layer != args.layer:
+                continue
+            results.append(measure(name, layer, fn, args.iterations, args.warmup))
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+        db.close()
+        engine.dispose()
+        clear_report_cache()
+
+    return {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'git_commit': git_commit(),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'transactions': total,
+            'categories': args.categories,
+            'days': args.days,
+            'page_size': args.page_size,
+            'batch_size': args.batch_size,
+            'export_days': args.export_days,
+            'iterations': args.iterations,
+        },
+        'results': results,
+    }
+
+
+def compare(current: dict, baseline: dict) -> None:
+    """Print the p50 change of each scenario against a previous results file."""
+    previous = {(r['layer'], r['name']): r for r in baseline.get('results', [])}
+    print(f"\nComparison with {baseline.get('meta', {}).get('git_commit') or 'baseline'} (p50):")
+    for result in current['results']:
+        before = previous.get((result['layer'], result['name']))
+        if before is None or not before['p50_ms']:
+            continue
+        change = (result['p50_ms'] - before['p50_ms']) / before['p50_ms'] * 100
+        print(f"  {result['layer']:8} {result['name']:32} {before['p50_ms']:10.2f} -> {result['p50_ms']:10.2f} ms "
+              f"({change:+.1f}%)")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transactions", type=int, default=10000, help="Transactions to seed (e.g. 10000, 1000000)")
+    parser.add_argument("--categories", type=int, default=200, help="Categories to seed")
+    parser.add_argument("--days", type=int, default=730, help="Days the seeded dates are spread over")
+    parser.add_argument("--db", default=str(BENCH_DIR / "bench.db"), help="SQLite file for the benchmark data")
+    parser.add_argument("--reuse", action="store_true", help="Reuse --db if it already holds enough transactions")
+    parser.add_argument("--iterations", type=int, default=20, help="Measured runs per scenario")
+    parser.add_argument("--warmup", type=int, default=2, help="Unmeasured runs per scenario")
+    parser.add_argument("--page-size", type=int, default=100, help="Rows per list page")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Rows per bulk write")
+    parser.add_argument("--export-days", type=int, default=31, help="Days covered by CSV/PDF exports")
+    parser.add_argument("--layer", choices=["all", "service", "http"], default="all")
+    parser.add_argument("--only", nargs="*", help="Scenario names (or layer:name) to run")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for the generated data")
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", help="Previous results file to compare against")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> dict:
+    args = parse_args(argv)
+    document = run_benchmarks(args)
+
+    output = Path(args.output) if args.output else (
+        BENCH_DIR / "results" / f"{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(document, indent=2))
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        compare(document, json.loads(Path(args.compare).read_text()))
+    return document
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Literal, Optional
 
 import os
 from pathlib import Path
@@ -16,6 +16,54 @@ class Settings(BaseSettings):
     # Database
     database_url: str = "sqlite:///./finance.db"
     
+    # Connection pool (ignored for in-memory SQLite)
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: int = 30
+    db_pool_recycle: int = 1800  # Seconds before a connection is replaced; -1 disables
+    db_pool_pre_ping: bool = True
+    
+    # Worker threads for sync (database-bound) route handlers; unset means
+    # db_pool_size + db_max_overflow so threads don't queue on the pool
+    threadpool_size: Optional[int] = None
+    
+    # Report rendering pool: "process" keeps CPU-heavy PDF layout off the API's GIL
+    report_executor: Literal["process", "thread"] = "process"
+    report_workers: int = 2
+    report_max_pending: int = 8  # Queued + running reports before new ones get 503
+    report_timeout: int = 300  # Seconds to wait for a report
+    report_cache_dir: str = str(BASE_DIR / "report_cache")
+    report_cache_max_bytes: int = 512 * 1024 * 1024  # Least recently used artifacts are evicted beyond this
+    report_job_history: int = 1000  # Finished jobs remembered for polling
+    
+    # In-process category cache; entries are reloaded after this many seconds so
+    # writes made by other processes are picked up
+    category_cache_ttl: int = 300
+    
+    # SQLite tuning, applied to every new connection
+    sqlite_journal_mode: Literal["DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"] = "WAL"
+    sqlite_synchronous: Literal["OFF", "NORMAL", "FULL", "EXTRA"] = "NORMAL"
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_cache_size_kib: int = 65536
+    sqlite_mmap_size: int = 268435456  # Bytes; 0 disables memory-mapped I/O
+    
+    # Response compression: "brotli" needs the optional brotli-asgi package and
+    # falls back to gzip without it
+    compression: Literal["off", "gzip", "brotli"] = "gzip"
+    compression_min_size: int = 1024  # Bytes; smaller bodies are sent as-is
+    compression_level: int = 6  # gzip level (1-9); brotli uses quality 4
+    
+    # Request timing/SQL metrics (Server-Timing header and /metrics)
+    metrics_enabled: bool = True
+    
+    # Slow-query log (off unless a threshold is set); entries are shown at
+    # /debug/slow-queries with their SQLite EXPLAIN QUERY PLAN
+    slow_query_ms: Optional[float] = None
+    slow_query_log_size: int = 200
+    
+    # Token for the /admin endpoints (sent as X-Admin-Token); unset disables them
+    admin_token: Optional[str] = None
+    
     # API
     api_title: str = "Finance API"
     api_version: str = "1.0.0"
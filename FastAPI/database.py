@@ -7,7 +7,8 @@ It defers engine + Session creation until first use, avoiding uvicorn/Windows sp
 """
 
 import logging
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 log = logging.getLogger(__name__)
@@ -21,6 +22,13 @@ except Exception:
     # if running as top-level module or in different import context
     import config as _config  # type: ignore
 
+try:
+    from .slow_queries import slow_query_log  # type: ignore
+    from .metrics import instrument_engine  # type: ignore
+except Exception:
+    from slow_queries import slow_query_log  # type: ignore
+    from metrics import instrument_engine  # type: ignore
+
 # Determine database url (prefer explicit DATABASE_URL, fallback to settings.database_url)
 _database_url = getattr(_config, "DATABASE_URL", None)
 if not _database_url:
@@ -33,6 +41,73 @@ if not _database_url:
 _engine = None
 _SessionLocal = None
 
+# Keep IN (...) lists well below SQLite's bound parameter limit
+IN_CLAUSE_CHUNK = 500
+
+
+def chunks(items: list, size: int = IN_CLAUSE_CHUNK):
+    """Split items into lists of at most size, e.g. for IN (...) queries."""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _sqlite_pragmas(settings) -> list:
+    """PRAGMA statements applied to each new SQLite connection."""
+    return [
+        f"PRAGMA journal_mode={settings.sqlite_journal_mode}",
+        f"PRAGMA synchronous={settings.sqlite_synchronous}",
+        f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}",
+        # Negative cache_size is in KiB rather than pages
+        f"PRAGMA cache_size=-{int(settings.sqlite_cache_size_kib)}",
+        f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}",
+    ]
+
+
+def build_engine(database_url: str, settings=None, poolclass=None):
+    """
+    Create an engine with pool settings and, for SQLite, per-connection pragmas.
+
+    Settings default to config.settings (pool size/overflow/timeout/recycle/pre-ping
+    and the sqlite_* tuning options). Pass poolclass (e.g. NullPool) to use a
+    different pool; the pool size settings are then not applied.
+    """
+    settings = settings or _config.settings
+    url = make_url(database_url)
+    kwargs = {"pool_pre_ping": settings.db_pool_pre_ping}
+    if poolclass is not None:
+        kwargs["poolclass"] = poolclass
+
+    if url.get_backend_name() == "sqlite":
+        # SQLite needs check_same_thread=False for threaded use
+        kwargs["connect_args"] = {"check_same_thread": False}
+        in_memory = url.database in (None, "", ":memory:") or "mode=memory" in str(url)
+    else:
+        in_memory = False
+
+    if not in_memory and poolclass is None:
+        kwargs.update(
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_recycle=settings.db_pool_recycle,
+        )
+
+    engine = create_engine(database_url, **kwargs)
+
+    if url.get_backend_name() == "sqlite":
+        pragmas = _sqlite_pragmas(settings)
+
+        @event.listens_for(engine, "connect")
+        def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            try:
+                for pragma in pragmas:
+                    cursor.execute(pragma)
+            finally:
+                cursor.close()
+
+    return engine
+
 
 def _init_engine():
     """Initialize the engine and sessionmaker lazily."""
@@ -44,10 +119,14 @@ def _init_engine():
     if not database_url:
         raise RuntimeError("DATABASE_URL is not configured (set env or config)")
 
-    # SQLite needs check_same_thread=False for threaded use
-    connect_args = {"check_same_thread": False} if database_url.startswith("sqlite") else {}
     log.info("Initializing DB engine for %s", database_url)
-    _engine = create_engine(database_url, connect_args=connect_args)
+    _engine = build_engine(database_url)
+    settings = _config.settings
+    if settings.metrics_enabled:
+        instrument_engine(_engine)
+    if settings.slow_query_ms is not None:
+        log.info("Logging SQL statements slower than %sms", settings.slow_query_ms)
+        slow_query_log.attach(_engine, settings.slow_query_ms, settings.slow_query_log_size)
     _SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=_engine)
     return _engine, _SessionLocal
 
@@ -1,5 +1,7 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+import anyio.to_thread
 import logging
 
 # Robust imports to support running as a package or from the FastAPI folder
@@ -7,14 +9,28 @@ try:
     # package import style (preferred)
     from .config import settings, DATABASE_URL  # type: ignore
     from .database import Base, get_engine, get_sessionmaker, get_db  # type: ignore
-    from .routers import transactions, categories  # type: ignore
-    from .models import Category  # type: ignore
+    from .routers import transactions, categories, debug, admin  # type: ignore
+    from .models import Category, Transaction  # type: ignore
+    from . import migrate_database  # type: ignore
+    from .services.report_service import ReportService  # type: ignore
+    from .services.category_service import CategoryCache  # type: ignore
+    from .services.rollup_service import RollupService  # type: ignore
+    from .services import version_service  # type: ignore  # noqa: F401 (registers data version hooks)
+    from .metrics import MetricsMiddleware, render_metrics  # type: ignore
+    from .profiling import ProfilingMiddleware  # type: ignore
 except Exception:
     # top-level import style (fallback)
     from config import settings, DATABASE_URL  # type: ignore
     from database import Base, get_engine, get_sessionmaker, get_db  # type: ignore
-    from routers import transactions, categories  # type: ignore
-    from models import Category  # type: ignore
+    from routers import transactions, categories, debug, admin  # type: ignore
+    from models import Category, Transaction  # type: ignore
+    import migrate_database  # type: ignore
+    from services.report_service import ReportService  # type: ignore
+    from services.category_service import CategoryCache  # type: ignore
+    from services.rollup_service import RollupService  # type: ignore
+    from services import version_service  # type: ignore  # noqa: F401 (registers data version hooks)
+    from metrics import MetricsMiddleware, render_metrics  # type: ignore
+    from profiling import ProfilingMiddleware  # type: ignore
 
 logger = logging.getLogger("uvicorn")
 
@@ -25,6 +41,33 @@ app = FastAPI(
     debug=settings.debug
 )
 
+def add_compression(app: FastAPI):
+    """Compress large responses (JSON pages, CSV exports) as configured by settings.compression."""
+    if settings.compression == "off":
+        return
+    if settings.compression == "brotli":
+        try:
+            from brotli_asgi import BrotliMiddleware
+        except ImportError:
+            logger.warning("compression=brotli needs the brotli-asgi package; using gzip")
+        else:
+            # Clients without brotli support still get gzip
+            app.add_middleware(
+                BrotliMiddleware,
+                quality=4,
+                minimum_size=settings.compression_min_size,
+                gzip_fallback=True,
+            )
+            return
+    app.add_middleware(
+        GZipMiddleware,
+        minimum_size=settings.compression_min_size,
+        compresslevel=settings.compression_level,
+    )
+
+
+add_compression(app)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -32,11 +75,24 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Last-Modified", "Server-Timing"],
 )
 
+# Lets POST /admin/profile?route=... see which requests are in flight
+app.add_middleware(ProfilingMiddleware)
+
+# Outermost, so timings cover compression and CORS handling too
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+
 # Include routers (router objects only - safe to import now)
 app.include_router(transactions.router)
 app.include_router(categories.router)
+# Admin endpoints (profiling) require X-Admin-Token and are off without ADMIN_TOKEN
+app.include_router(admin.router)
+# Debug endpoints expose SQL and its parameters; keep them out of production
+if settings.debug:
+    app.include_router(debug.router)
 
 
 @app.get("/")
@@ -55,6 +111,12 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Per-route request, SQL statement, DB time and row histograms in Prometheus format."""
+    return Response(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 def seed_default_categories():
     """Seed default categories if they don't exist."""
     # Import SQLAlchemy session/SessionLocal at runtime via get_sessionmaker to avoid
@@ -98,15 +160,65 @@ def seed_default_categories():
         db.close()
 
 
+def build_missing_rollup():
+    """Build the daily_totals rollup once for databases whose transactions predate it."""
+    db = get_sessionmaker()()
+    try:
+        rows = RollupService.rebuild_if_missing(db)
+        if rows is not None:
+            logger.info("Built daily_totals rollup (%d rows)", rows)
+    finally:
+        db.close()
+
+
+def warm_category_cache():
+    """Load categories into the in-process cache so the first writes don't query them."""
+    db = get_sessionmaker()()
+    try:
+        CategoryCache.load(db)
+    finally:
+        db.close()
+
+
+def upgrade_schema(engine):
+    """Bring tables created by older versions up to the current models."""
+    if engine.dialect.name == "sqlite":
+        # Converts REAL/TEXT transaction storage to integer cents/day numbers if needed
+        raw = engine.raw_connection()
+        try:
+            if migrate_database.upgrade_schema(raw.driver_connection):
+                logger.info("Converted transactions to integer amount/date storage")
+        finally:
+            raw.close()
+
+    # create_all skips existing tables entirely, including their new indexes
+    for index in Transaction.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
+
+
 @app.on_event("startup")
 def on_startup():
     """Create tables and seed defaults on app startup (not at import time)."""
     # Log the DB being used
     logger.info("Starting app with DATABASE_URL=%s", DATABASE_URL)
 
+    # Route handlers are sync so DB calls run in the threadpool, off the event loop
+    anyio.to_thread.current_default_thread_limiter().total_tokens = (
+        settings.threadpool_size or settings.db_pool_size + settings.db_max_overflow
+    )
+
     # Create tables (safe: engine is initialized lazily inside get_engine())
     engine = get_engine()
     Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine)
+    build_missing_rollup()
 
     # Seed default categories (idempotent)
     seed_default_categories()
+    warm_category_cache()
+
+
+@app.on_event("shutdown")
+def on_shutdown():
+    """Stop background report workers."""
+    ReportService.shutdown()
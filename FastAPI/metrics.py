@@ -0,0 +1,233 @@
+"""
+Per-request timing and SQL instrumentation.
+
+MetricsMiddleware times every request and, through SQLAlchemy events on the
+application engine, counts the SQL statements it runs, their total time and
+the rows they return or change. Each response gets a Server-Timing header,
+and per-route histograms are rendered in the Prometheus text format by
+render_metrics().
+"""
+
+import sqlite3
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100)
+ROW_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000)
+
+
+class RequestStats:
+    """SQL activity of the request being handled."""
+
+    __slots__ = ('statements', 'db_seconds', 'rows')
+
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.rows = 0
+
+    def server_timing(self, elapsed: float) -> str:
+        return (
+            f'app;dur={elapsed * 1000:.1f}, '
+            f'db;dur={self.db_seconds * 1000:.1f};desc="{self.statements} queries, {self.rows} rows"'
+        )
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar('request_stats', default=None)
+
+
+def current_stats() -> Optional[RequestStats]:
+    """Stats of the request running in this context, or None outside a request."""
+    return _current.get()
+
+
+def _start_statement(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the statement's execution context rather than the connection, so a
+    # statement that raises (and never reaches after_cursor_execute) leaves nothing behind
+    if _current.get() is not None and context is not None:
+        context._metrics_started = time.perf_counter()
+
+
+def _finish_statement(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    started = getattr(context, '_metrics_started', None)
+    if stats is None or started is None:
+        return
+    stats.statements += 1
+    stats.db_seconds += time.perf_counter() - started
+    # rowcount is the number of rows changed by writes; -1 for SELECTs
+    if cursor.rowcount > 0:
+        stats.rows += cursor.rowcount
+
+
+def _count_row(cursor, row):
+    stats = _current.get()
+    if stats is not None:
+        stats.rows += 1
+    return row
+
+
+def _count_fetched_rows(dbapi_connection, connection_record):
+    # sqlite3 can't report how many rows a SELECT returned, so count them as
+    # they're fetched; other drivers only report rows changed by writes
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        dbapi_connection.row_factory = _count_row
+
+
+_ENGINE_HOOKS = (
+    ('before_cursor_execute', _start_statement),
+    ('after_cursor_execute', _finish_statement),
+    ('connect', _count_fetched_rows),
+)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Count the statements, DB time and rows of requests on engine.
+
+    Only connections opened afterwards count fetched SQLite rows, so call this
+    before the engine is used (database._init_engine does, when
+    settings.metrics_enabled is on). Other engines, such as report workers',
+    are left untouched.
+    """
+    for name, hook in _ENGINE_HOOKS:
+        if not event.contains(engine, name, hook):
+            event.listen(engine, name, hook)
+
+
+def uninstrument_engine(engine: Engine) -> None:
+    """Stop counting requests' SQL on engine (open connections keep counting rows)."""
+    for name, hook in _ENGINE_HOOKS:
+        if event.contains(engine, name, hook):
+            event.remove(engine, name, hook)
+
+
+class _Histogram:
+    """Prometheus-style cumulative histogram keyed by label values."""
+
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float], label_names: Sequence[str]):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self.label_names = tuple(label_names)
+        # labels -> [count per bucket..., +Inf count, sum]
+        self.series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+        series[-2] += 1
+        series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self.series.items()):
+            label_text = ','.join(f'{name}="{_escape(value)}"' for name, value in zip(self.label_names, labels))
+            for bound, count in zip(self.buckets, series):
+                lines.append(f'{self.name}_bucket{{{label_text},le="{bound:g}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{label_text},le="+Inf"}} {series[-2]}')
+            lines.append(f'{self.name}_sum{{{label_text}}} {series[-1]:g}')
+            lines.append(f'{self.name}_count{{{label_text}}} {series[-2]}')
+        return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+_lock = threading.Lock()
+_requests_total: Dict[Tuple[str, str, str], int] = {}
+_ROUTE_LABELS = ('method', 'route')
+_histograms = {
+    'duration': _Histogram(
+        'http_request_duration_seconds', 'Request wall time, including streaming the body.',
+        DURATION_BUCKETS, _ROUTE_LABELS
+    ),
+    'statements': _Histogram(
+        'http_request_db_statements', 'SQL statements executed per request.', STATEMENT_BUCKETS, _ROUTE_LABELS
+    ),
+    'db_seconds': _Histogram(
+        'http_request_db_duration_seconds', 'Total SQL execution time per request.', DURATION_BUCKETS, _ROUTE_LABELS
+    ),
+    'rows': _Histogram(
+        'http_request_db_rows', 'Rows returned or changed by SQL per request.', ROW_BUCKETS, _ROUTE_LABELS
+    ),
+}
+
+
+def record_request(method: str, route: str, status: int, elapsed: float, stats: RequestStats) -> None:
+    """Add a finished request to the per-route metrics."""
+    labels = (method, route)
+    with _lock:
+        key = (method, route, str(status))
+        _requests_total[key] = _requests_total.get(key, 0) + 1
+        _histograms['duration'].observe(labels, elapsed)
+        _histograms['statements'].observe(labels, stats.statements)
+        _histograms['db_seconds'].observe(labels, stats.db_seconds)
+        _histograms['rows'].observe(labels, stats.rows)
+
+
+def render_metrics() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    with _lock:
+        lines = ["# HELP http_requests_total Requests handled.", "# TYPE http_requests_total counter"]
+        for (method, route, status), count in sorted(_requests_total.items()):
+            lines.append(
+                f'http_requests_total{{method="{method}",route="{_escape(route)}",status="{status}"}} {count}'
+            )
+        for histogram in _histograms.values():
+            lines.extend(histogram.render())
+    return '\n'.join(lines) + '\n'
+
+
+def reset_metrics() -> None:
+    """Forget all recorded requests."""
+    with _lock:
+        _requests_total.clear()
+        for histogram in _histograms.values():
+            histogram.series.clear()
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request timing and SQL statistics per route."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+                MutableHeaders(scope=message).append(
+                    'Server-Timing', stats.server_timing(time.perf_counter() - started)
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            # Route templates keep the label set bounded; unmatched paths share one label
+            route = getattr(scope.get('route'), 'path_format', None) or 'unmatched'
+            record_request(scope['method'], route, status, time.perf_counter() - started, stats)
@@ -4,15 +4,152 @@ This script will:
 1. Create the categories table if it doesn't exist
 2. Migrate existing category strings to the categories table
 3. Update transactions table to use category_id instead of category
+4. Convert transactions to integer storage (amount in cents, date as days since 1970-01-01)
+5. Add the composite/covering indexes used by the report and list queries
+6. Add the full-text search index over transaction descriptions
 """
 
+import logging
 import sqlite3
 from pathlib import Path
 import sys
 
+try:
+    from .models import parse_date  # type: ignore
+except ImportError:
+    from models import parse_date  # type: ignore
+
+logger = logging.getLogger(__name__)
+
 # Database path
 DB_PATH = Path(__file__).parent / "finance.db"
 
+def migrate_transaction_storage(cursor):
+    """
+    Rebuild transactions with integer cents amounts and integer day-number dates.
+    
+    Dates julianday() cannot read are normalized first; rows whose date cannot be
+    parsed at all are moved to transactions_invalid instead of aborting the upgrade.
+    
+    Returns True if the table was converted, False if it already uses integer storage.
+    """
+    cursor.execute("PRAGMA table_info(transactions)")
+    column_types = {col[1]: (col[2] or '').upper() for col in cursor.fetchall()}
+    if not column_types:
+        return False
+    if column_types.get('amount') == 'INTEGER' and column_types.get('date') == 'INTEGER':
+        return False
+    
+    # Older versions stored dates such as '2024-1-5', which julianday() reads as NULL
+    invalid_ids = []
+    for row_id, value in cursor.execute("SELECT id, date FROM transactions WHERE julianday(date) IS NULL").fetchall():
+        try:
+            normalized = parse_date(value).isoformat()
+        except (TypeError, ValueError):
+            invalid_ids.append((row_id,))
+            continue
+        cursor.execute("UPDATE transactions SET date = ? WHERE id = ?", (normalized, row_id))
+    if invalid_ids:
+        cursor.execute("CREATE TABLE IF NOT EXISTS transactions_invalid AS SELECT * FROM transactions WHERE 0")
+        cursor.executemany("INSERT INTO transactions_invalid SELECT * FROM transactions WHERE id = ?", invalid_ids)
+        cursor.executemany("DELETE FROM transactions WHERE id = ?", invalid_ids)
+        logger.warning("Moved %d transactions with unreadable dates to transactions_invalid", len(invalid_ids))
+    
+    cursor.execute("DROP TABLE IF EXISTS transactions_new")
+    cursor.execute("""
+        CREATE TABLE transactions_new (
+            id INTEGER NOT NULL,
+            amount INTEGER NOT NULL,
+            category_id INTEGER NOT NULL,
+            description VARCHAR,
+            is_income BOOLEAN NOT NULL,
+            date INTEGER NOT NULL,
+            PRIMARY KEY (id),
+            FOREIGN KEY(category_id) REFERENCES categories (id)
+        )
+    """)
+    cursor.execute("""
+        INSERT INTO transactions_new (id, amount, category_id, description, is_income, date)
+        SELECT id,
+               CAST(ROUND(amount * 100) AS INTEGER),
+               category_id,
+               description,
+               is_income,
+               CAST(julianday(date) - 2440587.5 AS INTEGER)
+        FROM transactions
+    """)
+    cursor.execute("DROP TABLE transactions")
+    cursor.execute("ALTER TABLE transactions_new RENAME TO transactions")
+    cursor.execute("CREATE INDEX IF NOT EXISTS ix_transactions_id ON transactions(id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS ix_transactions_category_id ON transactions(category_id)")
+    return True
+
+
+def upgrade_schema(conn):
+    """
+    Apply the post-category-migration upgrade steps to an open sqlite3 connection.
+    
+    Safe to run repeatedly; used by migrate_database() and at application startup.
+    """
+    cursor = conn.cursor()
+    try:
+        converted = migrate_transaction_storage(cursor)
+        add_transaction_indexes(cursor)
+        add_transaction_search(cursor, rebuild=converted)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return converted
+
+
+def add_transaction_indexes(cursor):
+    """Create the transaction filter/report indexes (mirrors models.Transaction)."""
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS ix_transactions_date_is_income
+        ON transactions(date, is_income, category_id, amount)
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS ix_transactions_category_date
+        ON transactions(category_id, date, is_income, amount)
+    """)
+
+
+def add_transaction_search(cursor, rebuild=False):
+    """
+    Create the FTS5 description index and its sync triggers (mirrors models.TRANSACTION_SEARCH_DDL).
+    
+    A newly created index is filled from the existing transactions; pass
+    rebuild=True to refill an existing one.
+    """
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'transactions_fts'")
+    created = cursor.fetchone() is None
+    cursor.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5(
+            description, content='transactions', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+        )
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS transactions_fts_insert AFTER INSERT ON transactions BEGIN
+            INSERT INTO transactions_fts (rowid, description) VALUES (new.id, new.description);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS transactions_fts_delete AFTER DELETE ON transactions BEGIN
+            INSERT INTO transactions_fts (transactions_fts, rowid, description) VALUES ('delete', old.id, old.description);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS transactions_fts_update AFTER UPDATE OF description ON transactions BEGIN
+            INSERT INTO transactions_fts (transactions_fts, rowid, description) VALUES ('delete', old.id, old.description);
+            INSERT INTO transactions_fts (rowid, description) VALUES (new.id, new.description);
+        END
+    """)
+    if created or rebuild:
+        cursor.execute("INSERT INTO transactions_fts (transactions_fts) VALUES ('rebuild')")
+    return created
+
+
 def migrate_database():
     """Migrate the database schema."""
     if not DB_PATH.exists():
@@ -28,7 +165,11 @@ def migrate_database():
         columns = [col[1] for col in cursor.fetchall()]
         
         if 'category_id' in columns:
-            print("Database already migrated. No action needed.")
+            print("Category migration already applied.")
+            print("Upgrading transaction storage, indexes and search index...")
+            if upgrade_schema(conn):
+                print("   - Converted amounts to integer cents and dates to day numbers")
+            print("✅ Database is up to date.")
             return
         
         if 'category' not in columns:
@@ -205,6 +346,10 @@ def migrate_database():
         
         conn.commit()
         
+        # Step 9: Integer storage, report indexes and search index
+        print("Converting storage and adding report indexes...")
+        upgrade_schema(conn)
+        
         # Get final category count
         cursor.execute("SELECT COUNT(*) FROM categories")
         final_category_count = cursor.fetchone()[0]
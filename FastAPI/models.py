@@ -1,9 +1,84 @@
-from sqlalchemy import Column, Integer, String, Boolean, Float, Date, ForeignKey
+import re
+from datetime import date, timedelta
+from sqlalchemy import Column, Integer, String, Boolean, Date, DateTime, ForeignKey, Index, DDL, event
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
+from sqlalchemy.types import TypeDecorator
 from database import Base
 
 
+EPOCH = date(1970, 1, 1)
+# SQLite julian day number of EPOCH, for date functions over DayNumber columns
+EPOCH_JULIAN_DAY = 2440587.5
+
+_DATE_PATTERN = re.compile(r'([0-9]{4})-([0-9]{1,2})-([0-9]{1,2})')
+
+
+def parse_date(value: str) -> date:
+    """Parse a YYYY-MM-DD date; month and day may omit their leading zero.
+    
+    Raises:
+        ValueError: If value is not such a date
+    """
+    match = _DATE_PATTERN.fullmatch(value)
+    if match is None:
+        raise ValueError(f"Invalid date: {value!r}")
+    return date(*(int(part) for part in match.groups()))
+
+
+class DayNumber(TypeDecorator):
+    """A date stored as an integer day number (days since 1970-01-01).
+    
+    Accepts and returns YYYY-MM-DD strings, so the API keeps its string dates
+    while range filters and index comparisons work on integers.
+    """
+    
+    impl = Integer
+    cache_ok = True
+    
+    def process_bind_param(self, value, dialect):
+        if value is None or isinstance(value, int):
+            return value
+        if isinstance(value, str):
+            value = parse_date(value)
+        return (value - EPOCH).days
+    
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return (EPOCH + timedelta(days=value)).isoformat()
+
+
+# Largest accepted amount: whole cents stay exact in a float, and daily sums of
+# many such amounts stay within SQLite's 64-bit INTEGER
+MAX_AMOUNT = 10_000_000_000
+
+
+def to_cents(amount: float) -> int:
+    """Convert an amount to the integer cents stored by Cents columns."""
+    return int(round(amount * 100))
+
+
+class Cents(TypeDecorator):
+    """A money amount stored as integer minor units (cents).
+    
+    Accepts and returns floats; SUMs over the column are exact integer sums.
+    """
+    
+    impl = Integer
+    cache_ok = True
+    
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return to_cents(value)
+    
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return value / 100
+
+
 class Category(Base):
     """Category model for transaction categories."""
     
@@ -30,11 +105,82 @@ class Transaction(Base):
     __tablename__ = 'transactions'
 
     id = Column(Integer, primary_key=True, index=True)
-    amount = Column(Float, nullable=False)
+    amount = Column(Cents, nullable=False)  # Integer cents
     category_id = Column(Integer, ForeignKey('categories.id'), nullable=False, index=True)
     description = Column(String, nullable=True)
     is_income = Column(Boolean, default=False, nullable=False)
-    date = Column(String, nullable=False)  # Using String for date to match current implementation
+    date = Column(DayNumber, nullable=False)  # Integer days since 1970-01-01, YYYY-MM-DD in Python
     
     # Relationship with category
     category_obj = relationship("Category", back_populates="transactions")
+    
+    __table_args__ = (
+        # Date-range filters (optionally with is_income) seek on the (date, is_income) prefix;
+        # category_id and amount make it covering for the SUM/COUNT report queries.
+        Index('ix_transactions_date_is_income', 'date', 'is_income', 'category_id', 'amount'),
+        # Covering index for per-category totals, read in GROUP BY order
+        Index('ix_transactions_category_date', 'category_id', 'date', 'is_income', 'amount'),
+    )
+
+
+# Full-text index over Transaction.description: an external-content FTS5 table
+# (it stores only the index; rows are read from transactions by rowid = id),
+# kept in sync by triggers so every write path updates it.
+TRANSACTION_SEARCH_DDL = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5(
+        description, content='transactions', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS transactions_fts_insert AFTER INSERT ON transactions BEGIN
+        INSERT INTO transactions_fts (rowid, description) VALUES (new.id, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS transactions_fts_delete AFTER DELETE ON transactions BEGIN
+        INSERT INTO transactions_fts (transactions_fts, rowid, description) VALUES ('delete', old.id, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS transactions_fts_update AFTER UPDATE OF description ON transactions BEGIN
+        INSERT INTO transactions_fts (transactions_fts, rowid, description) VALUES ('delete', old.id, old.description);
+        INSERT INTO transactions_fts (rowid, description) VALUES (new.id, new.description);
+    END
+    """,
+)
+
+for _statement in TRANSACTION_SEARCH_DDL:
+    event.listen(Transaction.__table__, 'after_create', DDL(_statement).execute_if(dialect='sqlite'))
+# Dropping transactions drops its triggers but would leave a stale index behind
+event.listen(
+    Transaction.__table__, 'before_drop', DDL('DROP TABLE IF EXISTS transactions_fts').execute_if(dialect='sqlite')
+)
+
+
+class DailyTotal(Base):
+    """Per-day rollup of transactions, maintained alongside every transaction write.
+    
+    Range reports read these rows instead of scanning transactions.
+    """
+    
+    __tablename__ = 'daily_totals'
+
+    date = Column(DayNumber, primary_key=True)
+    category_id = Column(Integer, primary_key=True)
+    is_income = Column(Boolean, primary_key=True)
+    total_cents = Column(Integer, nullable=False, default=0)  # Exact SUM of Transaction.amount in cents
+    count = Column(Integer, nullable=False, default=0)
+    
+    # Clustered on the primary key, so date-range reads are a single covering range scan
+    __table_args__ = {'sqlite_with_rowid': False}
+
+
+class DataVersion(Base):
+    """Per-table change counter, bumped in the same DB transaction as each write."""
+    
+    __tablename__ = 'data_versions'
+
+    name = Column(String, primary_key=True)  # Table name
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False)  # UTC time of the last committed change
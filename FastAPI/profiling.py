@@ -0,0 +1,189 @@
+"""
+On-demand stack-sampling profiler.
+
+A ProfileSession samples the Python stacks of every thread from a background
+thread (sys._current_frames), so the API keeps serving while it runs. It
+covers either a fixed number of seconds or the next N requests to one route;
+in the latter case samples are only taken while such a request is in flight.
+Results are rendered as collapsed stacks (flamegraph.pl/speedscope input) or
+a pstats-like table of self/total sample counts.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+# Leaf frames of threads that are parked rather than working
+_IDLE_FRAMES = {
+    ('threading.py', 'wait'),
+    ('threading.py', '_wait_for_tstate_lock'),
+    ('selectors.py', 'select'),
+    ('queue.py', 'get'),
+}
+MAX_DEPTH = 128
+
+
+def _route_of(scope) -> Optional[str]:
+    # Set by the router once the request is matched
+    return getattr(scope.get('route'), 'path_format', None)
+
+
+def _frame_label(code) -> str:
+    return f"{os.path.basename(code.co_filename)}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+class ProfileSession:
+    """One profiling run and the stacks it collected."""
+
+    def __init__(
+        self,
+        seconds: Optional[float] = None,
+        route: Optional[str] = None,
+        requests: int = 1,
+        timeout: float = 300,
+        interval: float = 0.005
+    ):
+        self.route = route
+        self.requests = requests
+        self.completed = 0
+        self.interval = interval
+        self.deadline = time.monotonic() + (seconds if route is None else timeout)
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.timed_out = False
+        self.done = threading.Event()
+        self._inflight: Dict[int, dict] = {}
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name='profiler', daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self.done.set()
+        self._thread.join()
+
+    def request_started(self, scope) -> None:
+        with self._lock:
+            self._inflight[id(scope)] = scope
+
+    def request_finished(self, scope) -> None:
+        with self._lock:
+            self._inflight.pop(id(scope), None)
+            if _route_of(scope) == self.route:
+                self.completed += 1
+                if self.completed >= self.requests:
+                    self.done.set()
+
+    def _active(self) -> bool:
+        if self.route is None:
+            return True
+        with self._lock:
+            scopes = list(self._inflight.values())
+        return any(_route_of(scope) == self.route for scope in scopes)
+
+    def _run(self) -> None:
+        own_ident = threading.get_ident()
+        while not self.done.is_set():
+            if time.monotonic() >= self.deadline:
+                self.timed_out = self.route is not None
+                break
+            if self._active():
+                self._sample(own_ident)
+            self.done.wait(self.interval)
+        self.done.set()
+
+    def _sample(self, own_ident: int) -> None:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        self.samples += 1
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident:
+                continue
+            code = frame.f_code
+            if (os.path.basename(code.co_filename), code.co_name) in _IDLE_FRAMES:
+                continue
+            labels = []
+            while frame is not None and len(labels) < MAX_DEPTH:
+                labels.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            labels.append(names.get(ident, f'thread-{ident}'))
+            self.stacks[';'.join(reversed(labels))] += 1
+
+    def collapsed(self) -> str:
+        """Collapsed stacks, one `root;...;leaf count` line each, busiest first."""
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+    def top(self, limit: int = 50) -> str:
+        """pstats-style table of samples spent in (self) and under (total) each function."""
+        own: Counter = Counter()
+        total: Counter = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(';')[1:]  # drop the thread name
+            if frames:
+                own[frames[-1]] += count
+            for label in set(frames):
+                total[label] += count
+        lines: List[str] = [f"{self.samples} samples every {self.interval * 1000:g}ms", "", "     self    total  function"]
+        for label, count in total.most_common(limit):
+            lines.append(f"{own[label]:9d} {count:8d}  {label}")
+        return '\n'.join(lines) + '\n'
+
+
+class Profiler:
+    """Runs at most one ProfileSession at a time."""
+
+    def __init__(self):
+        self.session: Optional[ProfileSession] = None
+        self._lock = threading.Lock()
+
+    def start(self, **kwargs) -> ProfileSession:
+        """
+        Start a profiling session.
+
+        Args:
+            **kwargs: ProfileSession arguments
+
+        Returns:
+            The running session
+
+        Raises:
+            RuntimeError: If another session is still running
+        """
+        with self._lock:
+            if self.session is not None:
+                raise RuntimeError("A profiling session is already running")
+            self.session = ProfileSession(**kwargs)
+            self.session.start()
+            return self.session
+
+    def finish(self, session: ProfileSession) -> None:
+        """Stop a session (if still running) and allow a new one."""
+        session.stop()
+        with self._lock:
+            if self.session is session:
+                self.session = None
+
+
+profiler = Profiler()
+
+
+class ProfilingMiddleware:
+    """ASGI middleware telling a route-scoped profiling session which requests are in flight."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        session = profiler.session
+        if scope['type'] != 'http' or session is None or session.route is None:
+            await self.app(scope, receive, send)
+            return
+
+        session.request_started(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            session.request_finished(scope)
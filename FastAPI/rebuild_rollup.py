@@ -0,0 +1,32 @@
+"""
+Rebuild the daily_totals rollup from the transactions table.
+
+Run this after changing transactions outside the API (e.g. with the sqlite3
+shell) or to verify the rollup; the API keeps it up to date on every write.
+"""
+
+from config import DATABASE_URL
+from database import Base, get_engine, get_sessionmaker
+from models import DailyTotal
+from services.rollup_service import RollupService
+
+
+def rebuild_rollup():
+    """Recreate every daily_totals row from the transactions table."""
+    print(f"Rebuilding daily_totals in {DATABASE_URL}")
+    Base.metadata.create_all(bind=get_engine(), tables=[DailyTotal.__table__])
+    db = get_sessionmaker()()
+    try:
+        rows = RollupService.rebuild(db)
+        db.commit()
+        print(f"✅ Rollup rebuilt with {rows} rows.")
+    except Exception as e:
+        db.rollback()
+        print(f"\n❌ Rebuild failed: {e}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    rebuild_rollup()
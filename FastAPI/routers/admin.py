@@ -0,0 +1,66 @@
+import secrets
+from typing import Optional
+
+import anyio
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from config import settings
+from profiling import profiler
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Allow the request only with the configured X-Admin-Token."""
+    if not settings.admin_token:
+        raise HTTPException(status_code=403, detail="Admin API is disabled; set ADMIN_TOKEN to enable it")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, settings.admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+
+@router.post("/profile", response_class=PlainTextResponse)
+async def profile(
+    seconds: Optional[float] = Query(None, gt=0, le=300, description="Profile all threads for this long"),
+    route: Optional[str] = Query(None, description="Route template to profile, e.g. /transactions/reports/download"),
+    requests: int = Query(1, ge=1, le=1000, description="Number of requests to the route to profile"),
+    timeout: float = Query(300, gt=0, le=3600, description="Give up waiting for route requests after this long"),
+    interval_ms: float = Query(5, ge=1, le=1000, description="Sampling interval"),
+    format: str = Query('collapsed', regex='^(collapsed|top)$'),
+):
+    """
+    Sample the stacks of all worker threads and return the profile.
+    
+    Give either **seconds** to profile everything for that long, or **route** to
+    profile the next **requests** requests to that route (sampling only while one
+    is in flight). The call returns when profiling ends; the API keeps serving
+    meanwhile.
+    
+    - **format**: `collapsed` stacks (for flamegraph.pl/speedscope) or `top`, a
+      pstats-like table of self/total samples per function
+    
+    Report rendering in the process pool happens outside this process and is not
+    sampled.
+    """
+    if (seconds is None) == (route is None):
+        raise HTTPException(status_code=400, detail="Pass exactly one of seconds or route")
+    try:
+        session = profiler.start(
+            seconds=seconds, route=route, requests=requests, timeout=timeout, interval=interval_ms / 1000
+        )
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    try:
+        # Wait without holding a worker thread
+        while not session.done.is_set():
+            await anyio.sleep(0.05)
+    finally:
+        profiler.finish(session)
+
+    body = session.collapsed() if format == 'collapsed' else session.top()
+    headers = {'X-Profile-Samples': str(session.samples)}
+    if route is not None:
+        headers['X-Profile-Requests'] = str(session.completed)
+        headers['X-Profile-Timed-Out'] = str(session.timed_out).lower()
+    return PlainTextResponse(body, headers=headers)
@@ -1,15 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from database import get_db
 from schemas import CategoryCreate, CategoryUpdate, CategoryResponse
 from services.category_service import CategoryService
+from services.version_service import VersionService
 
 router = APIRouter(prefix="/categories", tags=["categories"])
 
 
 @router.post("/", response_model=CategoryResponse, status_code=201)
-async def create_category(
+def create_category(
     category: CategoryCreate,
     db: Session = Depends(get_db)
 ):
@@ -24,7 +25,9 @@ async def create_category(
 
 
 @router.get("/", response_model=List[CategoryResponse])
-async def get_categories(
+def get_categories(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of records to return"),
     is_income: Optional[bool] = Query(None, description="Filter by income/expense"),
@@ -38,13 +41,21 @@ async def get_categories(
     - **limit**: Maximum number of records to return
     - **is_income**: Optional filter for income/expense categories
     - **is_default**: Optional filter for default categories
+    
+    Supports conditional requests: send the ETag back in If-None-Match to get
+    304 Not Modified while categories are unchanged.
     """
+    not_modified = VersionService.conditional_get(request, response, db, 'categories')
+    if not_modified:
+        return not_modified
     return CategoryService.get_categories(db, skip, limit, is_income, is_default)
 
 
 @router.get("/{category_id}", response_model=CategoryResponse)
-async def get_category(
+def get_category(
     category_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db)
 ):
     """
@@ -55,11 +66,15 @@ async def get_category(
     category = CategoryService.get_category(db, category_id)
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
+    # Only after the 404: `If-None-Match: *` must not match a missing category
+    not_modified = VersionService.conditional_get(request, response, db, 'categories')
+    if not_modified:
+        return not_modified
     return category
 
 
 @router.put("/{category_id}", response_model=CategoryResponse)
-async def update_category(
+def update_category(
     category_id: int,
     category_update: CategoryUpdate,
     db: Session = Depends(get_db)
@@ -74,7 +89,7 @@ async def update_category(
 
 
 @router.delete("/{category_id}", status_code=204)
-async def delete_category(
+def delete_category(
     category_id: int,
     db: Session = Depends(get_db)
 ):
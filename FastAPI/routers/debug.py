@@ -0,0 +1,27 @@
+from fastapi import APIRouter
+from schemas import SlowQueryLogResponse
+from slow_queries import slow_query_log
+
+router = APIRouter(prefix="/debug", tags=["debug"])
+
+
+@router.get("/slow-queries", response_model=SlowQueryLogResponse)
+def get_slow_queries():
+    """
+    List logged slow SQL statements, newest first.
+    
+    Enable logging by setting `SLOW_QUERY_MS`; each entry has the statement, its
+    bound parameters, duration and (on SQLite) the EXPLAIN QUERY PLAN output.
+    """
+    return {
+        "enabled": slow_query_log.enabled,
+        "threshold_ms": slow_query_log.threshold_ms,
+        "entries": slow_query_log.entries(),
+    }
+
+
+@router.delete("/slow-queries", status_code=204)
+def clear_slow_queries():
+    """Clear the slow-query log."""
+    slow_query_log.clear()
+    return None
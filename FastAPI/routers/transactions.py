@@ -1,18 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, UploadFile, File
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from database import get_db
-from schemas import TransactionCreate, TransactionUpdate, TransactionResponse
+from schemas import (
+    TransactionCreate, TransactionUpdate, TransactionResponse, ReportGroup, TransactionImportResult,
+    TransactionBatchRequest, TransactionBatchResult, ReportJobCreate, ReportJobResponse, BalanceSeries
+)
 from services.transaction_service import TransactionService
-import csv
-import io
-from fastapi.responses import StreamingResponse, Response
+from services.import_service import ImportService
+from services.report_service import PendingFileResponse, ReportService, REPORT_MEDIA_TYPES
+from services.version_service import VersionService
+from serialization import TRANSACTION_FIELDS, dump_rows, transaction_response
+from fastapi.responses import FileResponse, StreamingResponse, Response
 
 router = APIRouter(prefix="/transactions", tags=["transactions"])
 
 
 @router.post("/", response_model=TransactionResponse, status_code=201)
-async def create_transaction(
+def create_transaction(
     transaction: TransactionCreate,
     db: Session = Depends(get_db)
 ):
@@ -26,25 +31,59 @@ async def create_transaction(
     - **date**: Transaction date (YYYY-MM-DD format)
     """
     transaction_obj = TransactionService.create_transaction(db, transaction)
-    return {
-        "id": transaction_obj.id,
-        "amount": transaction_obj.amount,
-        "category_id": transaction_obj.category_id,
-        "category": transaction_obj.category_obj.name if transaction_obj.category_obj else None, "category_name": transaction_obj.category_obj.name if transaction_obj.category_obj else None,
-        "description": transaction_obj.description,
-        "is_income": transaction_obj.is_income,
-        "date": transaction_obj.date
-    }
+    return transaction_response(transaction_obj, status_code=201)
+
+
+@router.post("/batch", response_model=TransactionBatchResult)
+def batch_transactions(
+    batch: TransactionBatchRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Apply many creates, updates and deletes in one database transaction.
+    
+    - **create**: Transactions to create (same fields as POST /transactions/)
+    - **update**: Partial updates, each with the `id` of the transaction to change
+    - **delete**: IDs of transactions to delete
+    
+    Returns a result per item; items that fail (unknown transaction or category)
+    are skipped without affecting the rest of the batch.
+    """
+    return TransactionService.apply_batch(db, batch)
+
+
+@router.post("/import", response_model=TransactionImportResult)
+def import_transactions(
+    file: UploadFile = File(..., description="CSV (with header) or NDJSON file"),
+    format: Optional[str] = Query(None, regex='^(csv|ndjson)$', description="Upload format; guessed from the file if omitted"),
+    db: Session = Depends(get_db)
+):
+    """
+    Bulk import transactions from a CSV or NDJSON upload.
+    
+    Each row uses the same fields as POST /transactions/ (`amount`, `category` or
+    `category_id`, `description`, `is_income`, `date`). Valid rows are inserted in
+    large batches; invalid rows are skipped and reported with their row number. If
+    the upload stops being readable part-way, the rows before that point are kept
+    and the failure is reported as a row error.
+    """
+    fmt = format or ImportService.detect_format(file.filename, file.content_type)
+    if fmt is None:
+        raise HTTPException(status_code=400, detail="Cannot determine upload format; pass format=csv or format=ndjson")
+    return ImportService.import_transactions(db, ImportService.iter_records(file.file, fmt))
 
 
 @router.get("/", response_model=List[TransactionResponse])
-async def get_transactions(
+def get_transactions(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of records to return"),
     is_income: Optional[bool] = Query(None, description="Filter by income/expense"),
     category_id: Optional[int] = Query(None, description="Filter by category ID"),
     start_date: Optional[str] = Query(None, description='Start date YYYY-MM-DD'),
     end_date: Optional[str] = Query(None, description='End date YYYY-MM-DD'),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's X-Next-Cursor header"),
     db: Session = Depends(get_db)
 ):
     """
@@ -54,27 +93,71 @@ async def get_transactions(
     - **limit**: Maximum number of records to return
     - **is_income**: Optional filter for income/expense
     - **category_id**: Optional filter by category ID
+    - **cursor**: Keyset pagination cursor (takes precedence over skip)
+    
+    When a full page is returned, the `X-Next-Cursor` response header holds the
+    cursor for the next page. Supports If-None-Match/If-Modified-Since (304).
     """
-    transactions = TransactionService.get_transactions(db, skip, limit, is_income, category_id, start_date, end_date)
-    # Add category name to response
-    result = []
-    for t in transactions:
-        t_dict = {
-            "id": t.id,
-            "amount": t.amount,
-            "category_id": t.category_id,
-            "category": t.category_obj.name if t.category_obj else None, "category_name": t.category_obj.name if t.category_obj else None,
-            "description": t.description,
-            "is_income": t.is_income,
-            "date": t.date
-        }
-        result.append(t_dict)
-    return result
+    not_modified = VersionService.conditional_get(request, response, db, 'transactions', 'categories')
+    if not_modified:
+        return not_modified
+    after_id = TransactionService.decode_cursor(cursor) if cursor else None
+    rows = TransactionService.get_transaction_rows(
+        db, skip, limit, is_income, category_id, start_date, end_date, after_id=after_id
+    )
+    if len(rows) == limit:
+        response.headers['X-Next-Cursor'] = TransactionService.encode_cursor(rows[-1][0])
+    # Rows are already TransactionRow-shaped; serialize them directly rather than
+    # validating ORM objects through the response model
+    return Response(
+        content=dump_rows(TRANSACTION_FIELDS, rows), media_type='application/json', headers=dict(response.headers)
+    )
+
+
+@router.get("/search", response_model=List[TransactionResponse])
+def search_transactions(
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200, description="Words to find in descriptions"),
+    limit: int = Query(50, ge=1, le=1000, description="Maximum number of records to return"),
+    is_income: Optional[bool] = Query(None, description="Filter by income/expense"),
+    category_id: Optional[int] = Query(None, description="Filter by category ID"),
+    start_date: Optional[str] = Query(None, description='Start date YYYY-MM-DD'),
+    end_date: Optional[str] = Query(None, description='End date YYYY-MM-DD'),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's X-Next-Cursor header"),
+    db: Session = Depends(get_db)
+):
+    """
+    Full-text search over transaction descriptions, best matches first.
+
+    - **q**: Words to search for; all must match, and the last one also matches as a prefix
+      (`cof` finds "coffee"). Case and accents are ignored.
+    - **is_income** / **category_id** / **start_date** / **end_date**: Same filters as the list
+    - **cursor**: Keyset pagination cursor
+
+    When a full page is returned, the `X-Next-Cursor` response header holds the
+    cursor for the next page. Supports If-None-Match/If-Modified-Since (304).
+    """
+    not_modified = VersionService.conditional_get(request, response, db, 'transactions', 'categories')
+    if not_modified:
+        return not_modified
+    after = TransactionService.decode_search_cursor(cursor) if cursor else None
+    rows = TransactionService.search_transaction_rows(
+        db, q, limit, is_income, category_id, start_date, end_date, after=after
+    )
+    if len(rows) == limit:
+        response.headers['X-Next-Cursor'] = TransactionService.encode_cursor(rows[-1][0], rank=rows[-1][-1])
+    # Rows end with their rank, which zip() leaves out of the serialized fields
+    return Response(
+        content=dump_rows(TRANSACTION_FIELDS, rows), media_type='application/json', headers=dict(response.headers)
+    )
 
 
 @router.get("/{transaction_id}", response_model=TransactionResponse)
-async def get_transaction(
+def get_transaction(
     transaction_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db)
 ):
     """
@@ -85,19 +168,15 @@ async def get_transaction(
     transaction = TransactionService.get_transaction(db, transaction_id)
     if not transaction:
         raise HTTPException(status_code=404, detail="Transaction not found")
-    return {
-        "id": transaction.id,
-        "amount": transaction.amount,
-        "category_id": transaction.category_id,
-        "category": transaction.category_obj.name if transaction.category_obj else None, "category_name": transaction.category_obj.name if transaction.category_obj else None,
-        "description": transaction.description,
-        "is_income": transaction.is_income,
-        "date": transaction.date
-    }
+    # Only after the 404: `If-None-Match: *` must not match a missing transaction
+    not_modified = VersionService.conditional_get(request, response, db, 'transactions', 'categories')
+    if not_modified:
+        return not_modified
+    return transaction_response(transaction, headers=dict(response.headers))
 
 
 @router.put("/{transaction_id}", response_model=TransactionResponse)
-async def update_transaction(
+def update_transaction(
     transaction_id: int,
     transaction_update: TransactionUpdate,
     db: Session = Depends(get_db)
@@ -109,19 +188,11 @@ async def update_transaction(
     - **transaction_update**: Updated transaction data (only provided fields will be updated)
     """
     transaction = TransactionService.update_transaction(db, transaction_id, transaction_update)
-    return {
-        "id": transaction.id,
-        "amount": transaction.amount,
-        "category_id": transaction.category_id,
-        "category": transaction.category_obj.name if transaction.category_obj else None, "category_name": transaction.category_obj.name if transaction.category_obj else None,
-        "description": transaction.description,
-        "is_income": transaction.is_income,
-        "date": transaction.date
-    }
+    return transaction_response(transaction)
 
 
 @router.delete("/{transaction_id}", status_code=204)
-async def delete_transaction(
+def delete_transaction(
     transaction_id: int,
     db: Session = Depends(get_db)
 ):
@@ -137,23 +208,72 @@ async def delete_transaction(
 
 
 @router.get('/reports/aggregate')
-async def get_report_aggregate(
+def get_report_aggregate(
+    request: Request,
+    response: Response,
     start_date: Optional[str] = Query(None, description='Start date YYYY-MM-DD'),
     end_date: Optional[str] = Query(None, description='End date YYYY-MM-DD'),
     db: Session = Depends(get_db)
 ):
     """Return aggregated totals (income, expense, balance) and transactions count for a date range."""
-    agg = TransactionService.get_transactions_aggregate(db, start_date, end_date)
-    return {
-        'total_income': agg['total_income'],
-        'total_expense': agg['total_expense'],
-        'balance': agg['balance'],
-        'count': len(agg['transactions'])
-    }
+    not_modified = VersionService.conditional_get(request, response, db, 'transactions')
+    if not_modified:
+        return not_modified
+    return TransactionService.get_report_totals(db, start_date, end_date)
+
+
+@router.get('/reports/grouped', response_model=List[ReportGroup])
+def get_report_grouped(
+    request: Request,
+    response: Response,
+    group_by: str = Query('category', regex='^(category|month|week|day)$'),
+    is_income: Optional[bool] = Query(None, description="Filter by income/expense"),
+    start_date: Optional[str] = Query(None, description='Start date YYYY-MM-DD'),
+    end_date: Optional[str] = Query(None, description='End date YYYY-MM-DD'),
+    db: Session = Depends(get_db)
+):
+    """
+    Return totals grouped by category, month, ISO week or day.
+    
+    - **group_by**: One of category, month, week, day
+    - **is_income**: Optional filter for income/expense
+    - **start_date** / **end_date**: Optional inclusive date range
+    """
+    not_modified = VersionService.conditional_get(request, response, db, 'transactions', 'categories')
+    if not_modified:
+        return not_modified
+    return TransactionService.get_grouped_totals(db, group_by, is_income, start_date, end_date)
+
+
+@router.get('/reports/balance', response_model=BalanceSeries)
+def get_report_balance(
+    request: Request,
+    response: Response,
+    period: str = Query('day', regex='^(day|week|month)$'),
+    start_date: Optional[str] = Query(None, description='Start date YYYY-MM-DD'),
+    end_date: Optional[str] = Query(None, description='End date YYYY-MM-DD'),
+    db: Session = Depends(get_db)
+):
+    """
+    Return the net (income minus expense) and running balance per day, ISO week or month.
+    
+    - **period**: One of day, week, month
+    - **start_date** / **end_date**: Optional inclusive date range; defaults to the
+      span of the data. The running balance includes everything before the range.
+    
+    The series is columnar: `keys`, `net` and `balance` are parallel arrays with an
+    entry for every period in the range, including periods without transactions.
+    """
+    not_modified = VersionService.conditional_get(request, response, db, 'transactions')
+    if not_modified:
+        return not_modified
+    return TransactionService.get_balance_series(db, period, start_date, end_date)
 
 
 @router.get('/reports/download')
-async def download_report(
+def download_report(
+    request: Request,
+    response: Response,
     file_type: str = Query('csv', regex='^(csv|pdf)$'),
     start_date: Optional[str] = Query(None, description='Start date YYYY-MM-DD'),
     end_date: Optional[str] = Query(None, description='End date YYYY-MM-DD'),
@@ -161,86 +281,65 @@ async def download_report(
 ):
     """Download transactions as CSV or PDF for a given date range.
 
-    CSV: returns a CSV streaming response.
-    PDF: returns a simple text-based PDF (basic fallback) if PDF generation libraries unavailable.
+    CSV: streams rows from the database in batches, so memory stays flat.
+    PDF: rendered in a bounded worker pool (503 when the queue is full); returns a simple
+    text-based body (basic fallback) if PDF generation libraries are unavailable.
+    
+    Both are cached on disk per data version, so repeat downloads of an unchanged
+    range are served straight from the cached file.
     """
-    agg = TransactionService.get_transactions_aggregate(db, start_date, end_date)
-    transactions = agg['transactions']
+    TransactionService.validate_date_range(start_date, end_date)
+    not_modified = VersionService.conditional_get(request, response, db, 'transactions', 'categories')
+    if not_modified:
+        return not_modified
+    # Responses returned directly don't pick up headers set on `response`
+    cache_headers = dict(response.headers)
+
+    filename = f'transactions_{start_date or "all"}_{end_date or "all"}.{file_type}'
+    media_type = REPORT_MEDIA_TYPES[file_type]
+
+    # Unchanged data and range: serve the cached artifact without rebuilding it
+    path = ReportService.artifact_path(db, file_type, start_date, end_date)
+    if ReportService.is_cached(path):
+        return FileResponse(path, media_type=media_type, filename=filename, headers=cache_headers)
 
     if file_type == 'csv':
-        output = io.StringIO()
-        writer = csv.writer(output)
-        writer.writerow(['id', 'amount', 'category_id', 'category_name', 'description', 'is_income', 'date'])
-        for t in transactions:
-            writer.writerow([
-                t.id,
-                t.amount,
-                t.category_id,
-                t.category_obj.name if t.category_obj else None,
-                t.description,
-                t.is_income,
-                t.date
-            ])
-        output.seek(0)
-        headers = {
-            'Content-Disposition': f'attachment; filename="transactions_{start_date or "all"}_{end_date or "all"}.csv"'
-        }
-        return StreamingResponse(iter([output.getvalue().encode('utf-8')]), media_type='text/csv', headers=headers)
-
-    # Generate a nicely formatted PDF using reportlab
-    try:
-        from reportlab.lib.pagesizes import letter, landscape
-        from reportlab.lib import colors
-        from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-        from reportlab.lib.styles import getSampleStyleSheet
-        from reportlab.lib.units import inch
-        import datetime
-
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=landscape(letter), leftMargin=0.5*inch, rightMargin=0.5*inch)
-        styles = getSampleStyleSheet()
-        elems = []
-
-        title = Paragraph('Transactions Report', styles['Title'])
-        elems.append(title)
-        elems.append(Spacer(1, 0.1*inch))
-        date_range_text = f'Date Range: {start_date or "-"} to {end_date or "-"}  Generated: {datetime.date.today()}'
-        elems.append(Paragraph(date_range_text, styles['Normal']))
-        elems.append(Spacer(1, 0.2*inch))
-
-        # Build table data
-        data = [['ID', 'Amount', 'Category', 'Description', 'Type', 'Date']]
-        for t in transactions:
-            data.append([
-                str(t.id),
-                f"{t.amount:.2f}",
-                t.category_obj.name if t.category_obj else '',
-                (t.description or '').replace('\n', ' '),
-                'Income' if t.is_income else 'Expense',
-                t.date
-            ])
-
-        table = Table(data, repeatRows=1)
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0,0), (-1,0), colors.HexColor('#f0f0f0')),
-            ('TEXTCOLOR', (0,0), (-1,0), colors.black),
-            ('ALIGN', (1,1), (-1,-1), 'LEFT'),
-            ('GRID', (0,0), (-1,-1), 0.25, colors.grey),
-            ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0,0), (-1,-1), 9),
-            ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-        ]))
-
-        elems.append(table)
-        doc.build(elems)
-        buffer.seek(0)
-        headers = {
-            'Content-Disposition': f'attachment; filename="transactions_{start_date or "all"}_{end_date or "all"}.pdf"'
-        }
-        return StreamingResponse(buffer, media_type='application/pdf', headers=headers)
-    except Exception as e:
-        # If PDF generation fails, fall back to plain text CSV-like response
-        body = '\n'.join([f"{t.id},{t.amount},{t.category_obj.name if t.category_obj else ''},{(t.description or '').replace('\n',' ')},{t.is_income},{t.date}" for t in transactions])
-        headers = {'Content-Disposition': f'attachment; filename="transactions_{start_date or "all"}_{end_date or "all"}.pdf"'}
-        return Response(content=body.encode('utf-8'), media_type='application/pdf', headers=headers)
+        headers = {**cache_headers, 'Content-Disposition': f'attachment; filename="{filename}"'}
+        return StreamingResponse(
+            ReportService.stream_csv_to_cache(db, start_date, end_date, path), media_type=media_type, headers=headers
+        )
+
+    # PDF layout is CPU-bound; render it in the bounded report worker pool and
+    # wait for it on the event loop rather than in this handler's thread
+    future = ReportService.render_file(db, file_type, start_date, end_date, path)
+    return PendingFileResponse(future, path, media_type=media_type, filename=filename, headers=cache_headers)
+
+
+@router.post('/reports/jobs', response_model=ReportJobResponse, status_code=202)
+def create_report_job(
+    job: ReportJobCreate,
+    db: Session = Depends(get_db)
+):
+    """
+    Submit a background CSV/PDF report job.
+    
+    Poll `GET /transactions/reports/jobs/{job_id}` until the status is `done`, then
+    fetch `/transactions/reports/jobs/{job_id}/download`. A job for a range whose
+    data has not changed since the last export completes immediately from the cache.
+    """
+    return ReportService.submit_job(db, job.file_type, job.start_date, job.end_date)
+
+
+@router.get('/reports/jobs/{job_id}', response_model=ReportJobResponse)
+def get_report_job(job_id: str):
+    """Get the status of a report job."""
+    return ReportService.get_job(job_id)
+
 
+@router.get('/reports/jobs/{job_id}/download')
+def download_report_job(job_id: str):
+    """Download the finished artifact of a report job."""
+    artifact = ReportService.get_job_artifact(job_id)
+    return FileResponse(
+        artifact['path'], media_type=REPORT_MEDIA_TYPES[artifact['file_type']], filename=artifact['filename']
+    )
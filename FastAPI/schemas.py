@@ -1,6 +1,14 @@
+from decimal import Decimal
 from pydantic import BaseModel, Field, field_validator
-from typing import Optional
-from datetime import datetime
+from typing import Any, List, Optional
+from models import MAX_AMOUNT, parse_date
+
+
+def _check_cents(amount: float) -> float:
+    """Reject amounts with more than two decimal places, which cents storage would round."""
+    if Decimal(repr(amount)).as_tuple().exponent < -2:
+        raise ValueError('Amount must not have more than two decimal places')
+    return amount
 
 
 # Category Schemas
@@ -39,22 +47,27 @@ class CategoryResponse(CategoryBase):
 class TransactionBase(BaseModel):
     """Base schema for transaction data."""
     
-    amount: float = Field(..., gt=0, description="Transaction amount (must be positive)")
+    amount: float = Field(..., gt=0, le=MAX_AMOUNT, description="Transaction amount (must be positive, in whole cents)")
     category_id: Optional[int] = None
     description: Optional[str] = Field(None, max_length=500, description="Transaction description")
     is_income: bool = Field(default=False, description="Whether this is an income transaction")
     date: str = Field(..., description="Transaction date (YYYY-MM-DD format)")
     category: Optional[str] = Field(None, description="Category name (optional, will be used to resolve/create category)")
     
+    @field_validator('amount')
+    @classmethod
+    def validate_amount(cls, v: float) -> float:
+        """Validate that the amount is in whole cents."""
+        return _check_cents(v)
+    
     @field_validator('date')
     @classmethod
     def validate_date(cls, v: str) -> str:
-        """Validate date format."""
+        """Validate date format and normalize it to zero-padded YYYY-MM-DD."""
         try:
-            datetime.strptime(v, '%Y-%m-%d')
+            return parse_date(v).isoformat()
         except ValueError:
             raise ValueError('Date must be in YYYY-MM-DD format')
-        return v
 
 
 class TransactionCreate(TransactionBase):
@@ -65,19 +78,25 @@ class TransactionCreate(TransactionBase):
 class TransactionUpdate(BaseModel):
     """Schema for updating a transaction."""
     
-    amount: Optional[float] = Field(None, gt=0)
+    amount: Optional[float] = Field(None, gt=0, le=MAX_AMOUNT)
     category_id: Optional[int] = None
     description: Optional[str] = Field(None, max_length=500)
     is_income: Optional[bool] = None
     date: Optional[str] = None
     
+    @field_validator('amount')
+    @classmethod
+    def validate_amount(cls, v: Optional[float]) -> Optional[float]:
+        """Validate that the amount is in whole cents if provided."""
+        return v if v is None else _check_cents(v)
+    
     @field_validator('date')
     @classmethod
     def validate_date(cls, v: Optional[str]) -> Optional[str]:
-        """Validate date format if provided."""
+        """Validate date format if provided and normalize it to zero-padded YYYY-MM-DD."""
         if v is not None:
             try:
-                datetime.strptime(v, '%Y-%m-%d')
+                return parse_date(v).isoformat()
             except ValueError:
                 raise ValueError('Date must be in YYYY-MM-DD format')
         return v
@@ -97,3 +116,110 @@ class TransactionResponse(BaseModel):
     class Config:
         from_attributes = True
 
+
+
+class TransactionBatchUpdate(TransactionUpdate):
+    """Schema for one update inside a batch request."""
+    
+    id: int
+
+
+class TransactionBatchRequest(BaseModel):
+    """Schema for a batch of creates, updates and deletes applied in one DB transaction."""
+    
+    create: List[TransactionCreate] = Field(default_factory=list, max_length=10000)
+    update: List[TransactionBatchUpdate] = Field(default_factory=list, max_length=10000)
+    delete: List[int] = Field(default_factory=list, max_length=10000, description="Transaction IDs to delete")
+
+
+class BatchItemResult(BaseModel):
+    """Schema for the outcome of one batch item."""
+    
+    op: str = Field(..., description="create, update or delete")
+    index: int = Field(..., description="Position of the item in its list")
+    id: Optional[int] = None
+    ok: bool
+    detail: Optional[str] = None
+
+
+class TransactionBatchResult(BaseModel):
+    """Schema for the result of a batch request."""
+    
+    succeeded: int
+    failed: int
+    results: List[BatchItemResult]
+
+
+class ImportRowError(BaseModel):
+    """Schema for a rejected row of a bulk import."""
+    
+    row: int = Field(..., description="1-based data row (CSV) or line (NDJSON) number in the upload")
+    errors: List[str]
+
+
+class TransactionImportResult(BaseModel):
+    """Schema for the result of a bulk import."""
+    
+    inserted: int
+    failed: int
+    errors: List[ImportRowError] = Field(default_factory=list, description="Row errors (capped)")
+
+
+# Report Schemas
+class ReportGroup(BaseModel):
+    """Schema for one bucket of a grouped report."""
+    
+    key: str = Field(..., description="Category name, month (YYYY-MM), ISO week (YYYY-Www) or day (YYYY-MM-DD)")
+    category_id: Optional[int] = None
+    total_income: float
+    total_expense: float
+    balance: float
+    count: int
+
+
+class BalanceSeries(BaseModel):
+    """Schema for a balance-over-time series, as parallel arrays."""
+    
+    period: str = Field(..., description="day, week or month")
+    opening_balance: float = Field(..., description="Balance before the first period")
+    keys: List[str] = Field(..., description="Day (YYYY-MM-DD), ISO week (YYYY-Www) or month (YYYY-MM) of each point")
+    net: List[float] = Field(..., description="Income minus expense in each period")
+    balance: List[float] = Field(..., description="Running balance at the end of each period")
+
+
+class ReportJobCreate(BaseModel):
+    """Schema for submitting a report job."""
+    
+    file_type: str = Field('csv', pattern='^(csv|pdf)$')
+    start_date: Optional[str] = Field(None, description="Start date YYYY-MM-DD")
+    end_date: Optional[str] = Field(None, description="End date YYYY-MM-DD")
+
+
+class ReportJobResponse(BaseModel):
+    """Schema for a report job's status."""
+    
+    id: str
+    status: str = Field(..., description="queued, running, done or failed")
+    file_type: str
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    error: Optional[str] = None
+
+
+class SlowQuery(BaseModel):
+    """Schema for a logged slow SQL statement."""
+    
+    recorded_at: str
+    duration_ms: float
+    statement: str
+    parameters: Any = None
+    executemany: Optional[int] = Field(None, description="Parameter sets, for executemany statements")
+    plan: Optional[List[str]] = Field(None, description="SQLite EXPLAIN QUERY PLAN lines")
+
+
+class SlowQueryLogResponse(BaseModel):
+    """Schema for the slow-query log."""
+    
+    enabled: bool
+    threshold_ms: Optional[float] = None
+    entries: List[SlowQuery]
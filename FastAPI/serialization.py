@@ -0,0 +1,75 @@
+"""
+Fast JSON serialization for large responses.
+
+Uses orjson when it is installed and falls back to the standard json module,
+producing the same JSON either way.
+"""
+
+import json
+from typing import Any, Iterable, Mapping, NamedTuple, Optional, Sequence
+
+from fastapi import Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+class TransactionRow(NamedTuple):
+    """A transaction as sent to clients, in TransactionResponse field order.
+
+    TransactionService row queries select exactly these columns, so their
+    tuples can be serialized without building ORM objects.
+    """
+
+    id: int
+    amount: float
+    category_id: int
+    category: Optional[str]
+    description: Optional[str]
+    is_income: bool
+    date: str
+
+    @classmethod
+    def from_model(cls, transaction) -> "TransactionRow":
+        """Build a row from a Transaction, reading each attribute once."""
+        category = transaction.category_obj
+        return cls(
+            transaction.id,
+            transaction.amount,
+            transaction.category_id,
+            category.name if category is not None else None,
+            transaction.description,
+            transaction.is_income,
+            transaction.date,
+        )
+
+
+TRANSACTION_FIELDS = TransactionRow._fields
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize content to compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(',', ':')).encode('utf-8')
+
+
+def dump_rows(fields: Sequence[str], rows: Iterable[Sequence[Any]]) -> bytes:
+    """Serialize row tuples as a JSON array of objects keyed by fields."""
+    return dumps([dict(zip(fields, row)) for row in rows])
+
+
+def transaction_response(
+    transaction,
+    status_code: int = 200,
+    headers: Optional[Mapping[str, str]] = None
+) -> Response:
+    """JSON response for a single Transaction, shaped like TransactionResponse."""
+    return Response(
+        content=dumps(TransactionRow.from_model(transaction)._asdict()),
+        status_code=status_code,
+        media_type='application/json',
+        headers=headers,
+    )
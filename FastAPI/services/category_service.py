@@ -1,8 +1,182 @@
+import threading
+import time
+import weakref
+from sqlalchemy import event, insert
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set
 from fastapi import HTTPException
+from config import settings
+from database import chunks
 from models import Category
 from schemas import CategoryCreate, CategoryUpdate
+from services.version_service import VersionService
+
+
+class CachedCategory(NamedTuple):
+    """Read-only snapshot of a category row."""
+    
+    id: int
+    name: str
+    description: Optional[str]
+    is_income: bool
+    is_default: bool
+
+
+class _CacheEntry(NamedTuple):
+    loaded_at: float
+    by_id: Dict[int, CachedCategory]
+    by_name: Dict[str, CachedCategory]
+
+
+class CategoryCache:
+    """
+    In-process cache of the categories table, one snapshot per database engine.
+    
+    Hits cost no queries. A miss falls back to the database, so a category
+    created by another process is still found; entries are also reloaded after
+    settings.category_cache_ttl seconds. Commits that write categories and
+    table create/drop invalidate the snapshot.
+    """
+    
+    _entries: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+    _lock = threading.Lock()
+    
+    @staticmethod
+    def _engine(db: Session):
+        return db.get_bind().engine
+    
+    @staticmethod
+    def load(db: Session) -> _CacheEntry:
+        """
+        Load all categories into the cache with a single query.
+        
+        Args:
+            db: Database session
+            
+        Returns:
+            The new cache entry
+        """
+        rows = db.query(
+            Category.id, Category.name, Category.description, Category.is_income, Category.is_default
+        ).order_by(Category.id).all()
+        by_id = {row.id: CachedCategory(*row) for row in rows}
+        by_name: Dict[str, CachedCategory] = {}
+        for category in by_id.values():
+            by_name.setdefault(category.name, category)
+        entry = _CacheEntry(time.monotonic(), by_id, by_name)
+        with CategoryCache._lock:
+            CategoryCache._entries[CategoryCache._engine(db)] = entry
+        return entry
+    
+    @staticmethod
+    def _entry(db: Session) -> _CacheEntry:
+        entry = CategoryCache._entries.get(CategoryCache._engine(db))
+        if entry is None or time.monotonic() - entry.loaded_at > settings.category_cache_ttl:
+            entry = CategoryCache.load(db)
+        return entry
+    
+    @staticmethod
+    def invalidate(engine=None) -> None:
+        """Drop the cached snapshot of an engine, or of every engine if engine is None."""
+        with CategoryCache._lock:
+            if engine is None:
+                CategoryCache._entries.clear()
+            else:
+                CategoryCache._entries.pop(engine, None)
+    
+    @staticmethod
+    def _from_database(db: Session, condition) -> Optional[CachedCategory]:
+        row = db.query(
+            Category.id, Category.name, Category.description, Category.is_income, Category.is_default
+        ).filter(condition).order_by(Category.id).first()
+        if row is None:
+            return None
+        # The snapshot is missing a committed row; reload it on next use
+        CategoryCache.invalidate(CategoryCache._engine(db))
+        return CachedCategory(*row)
+    
+    @staticmethod
+    def get_by_id(db: Session, category_id: Optional[int]) -> Optional[CachedCategory]:
+        """
+        Get a category by ID.
+        
+        Args:
+            db: Database session
+            category_id: Category ID
+            
+        Returns:
+            Cached category if found, None otherwise
+        """
+        if category_id is None:
+            return None
+        category = CategoryCache._entry(db).by_id.get(category_id)
+        if category is None:
+            category = CategoryCache._from_database(db, Category.id == category_id)
+        return category
+    
+    @staticmethod
+    def get_by_name(db: Session, name: str) -> Optional[CachedCategory]:
+        """
+        Get a category by name.
+        
+        Args:
+            db: Database session
+            name: Category name
+            
+        Returns:
+            Cached category if found, None otherwise
+        """
+        category = CategoryCache._entry(db).by_name.get(name)
+        if category is None:
+            category = CategoryCache._from_database(db, Category.name == name)
+        return category
+    
+    @staticmethod
+    def get_name_map(db: Session) -> Dict[str, int]:
+        """Get a copy of the cached category name to ID mapping."""
+        return {name: category.id for name, category in CategoryCache._entry(db).by_name.items()}
+    
+    @staticmethod
+    def find_missing(db: Session, names: Iterable[str], ids: Iterable[int]) -> List[CachedCategory]:
+        """
+        Look up categories that are not in the snapshot, in the database.
+        
+        Categories created by another process since the snapshot was loaded are
+        found this way; usually a single IN (...) query per kind.
+        
+        Args:
+            db: Database session
+            names: Category names that may be missing
+            ids: Category IDs that may be missing
+            
+        Returns:
+            The categories found, ordered by ID
+        """
+        entry = CategoryCache._entry(db)
+        names = [name for name in set(names) if name not in entry.by_name]
+        ids = [id_ for id_ in set(ids) if id_ not in entry.by_id]
+        columns = (Category.id, Category.name, Category.description, Category.is_income, Category.is_default)
+        found = {}
+        for column, values in ((Category.name, names), (Category.id, ids)):
+            for chunk in chunks(values):
+                for row in db.query(*columns).filter(column.in_(chunk)):
+                    found[row.id] = CachedCategory(*row)
+        if found:
+            # The snapshot is missing committed rows; reload it on next use
+            CategoryCache.invalidate(CategoryCache._engine(db))
+        return [found[id_] for id_ in sorted(found)]
+
+
+@VersionService.on_commit
+def _invalidate_on_commit(session: Session, tables) -> None:
+    if 'categories' in tables:
+        CategoryCache.invalidate(session.get_bind().engine)
+
+
+@event.listens_for(Category.__table__, "after_create")
+@event.listens_for(Category.__table__, "after_drop")
+def _invalidate_on_ddl(target, connection, **kw) -> None:
+    CategoryCache.invalidate(connection.engine)
 
 
 class CategoryService:
@@ -24,8 +198,7 @@ class CategoryService:
             HTTPException: If category name already exists
         """
         # Check if category with same name exists
-        existing = db.query(Category).filter(Category.name == category.name).first()
-        if existing:
+        if CategoryCache.get_by_name(db, category.name) is not None:
             raise HTTPException(
                 status_code=400,
                 detail=f"Category with name '{category.name}' already exists"
@@ -49,7 +222,11 @@ class CategoryService:
         Returns:
             Category if found, None otherwise
         """
-        return db.query(Category).filter(Category.id == category_id).first()
+        # Unknown IDs are answered from the cache; known ones load by primary key,
+        # which is free when the row is already in the session
+        if CategoryCache.get_by_id(db, category_id) is None:
+            return None
+        return db.get(Category, category_id)
     
     @staticmethod
     def get_category_by_name(db: Session, name: str) -> Optional[Category]:
@@ -63,7 +240,78 @@ class CategoryService:
         Returns:
             Category if found, None otherwise
         """
-        return db.query(Category).filter(Category.name == name).first()
+        cached = CategoryCache.get_by_name(db, name)
+        if cached is None:
+            return None
+        return db.get(Category, cached.id)
+    
+    @staticmethod
+    def get_name_map(db: Session) -> Dict[str, int]:
+        """
+        Get a mapping of category name to ID for all categories, from the cache.
+        
+        The snapshot may miss categories created by other processes; pass the
+        names and IDs a caller needs to resolve_missing before relying on it.
+        
+        Args:
+            db: Database session
+            
+        Returns:
+            Dict of category name to category ID
+        """
+        return CategoryCache.get_name_map(db)
+    
+    @staticmethod
+    def resolve_missing(
+        db: Session,
+        name_map: Dict[str, int],
+        known_ids: Set[int],
+        names: Iterable[str],
+        ids: Iterable[int]
+    ) -> None:
+        """
+        Add categories missing from a name map and ID set, looking them up in the database.
+        
+        Use this before bulk_create_by_name so categories created by another
+        worker since the cache was loaded are reused rather than duplicated.
+        
+        Args:
+            db: Database session
+            name_map: Category name to ID mapping, updated in place
+            known_ids: Known category IDs, updated in place
+            names: Category names that are needed
+            ids: Category IDs that are needed
+        """
+        names = [name for name in names if name not in name_map]
+        ids = [id_ for id_ in ids if id_ not in known_ids]
+        if not names and not ids:
+            return
+        for category in CategoryCache.find_missing(db, names, ids):
+            name_map.setdefault(category.name, category.id)
+            known_ids.add(category.id)
+    
+    @staticmethod
+    def bulk_create_by_name(db: Session, names: Dict[str, bool]) -> Dict[str, int]:
+        """
+        Insert several non-default categories in one statement, without committing.
+        
+        Args:
+            db: Database session
+            names: Mapping of new category name to its is_income flag
+            
+        Returns:
+            Dict of the new category names to their IDs
+        """
+        if not names:
+            return {}
+        db.execute(insert(Category), [
+            {'name': name, 'description': None, 'is_income': is_income, 'is_default': False}
+            for name, is_income in names.items()
+        ])
+        return {
+            name: id_
+            for id_, name in db.query(Category.id, Category.name).filter(Category.name.in_(list(names)))
+        }
     
     @staticmethod
     def get_categories(
@@ -0,0 +1,186 @@
+import csv
+import io
+import json
+from typing import IO, Iterable, Iterator, List, Optional, Tuple
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from models import Transaction
+from schemas import TransactionCreate
+from services.category_service import CategoryService
+from services.rollup_service import RollupService
+
+
+IMPORT_FORMATS = ('csv', 'ndjson')
+
+# (row number, parsed record or None, parse error or None); the row number is the
+# data row for CSV and the line number for NDJSON
+ImportRecord = Tuple[int, Optional[dict], Optional[str]]
+
+
+class ImportService:
+    """Service class for bulk transaction imports."""
+
+    @staticmethod
+    def detect_format(filename: Optional[str], content_type: Optional[str]) -> Optional[str]:
+        """
+        Guess the import format from an upload's filename or content type.
+
+        Args:
+            filename: Uploaded file name
+            content_type: Uploaded file content type
+
+        Returns:
+            'csv', 'ndjson' or None if it cannot be determined
+        """
+        name = (filename or '').lower()
+        ctype = (content_type or '').lower()
+        if name.endswith(('.ndjson', '.jsonl')) or 'ndjson' in ctype or 'jsonl' in ctype:
+            return 'ndjson'
+        if name.endswith('.csv') or 'csv' in ctype:
+            return 'csv'
+        return None
+
+    @staticmethod
+    def iter_records(stream: IO[bytes], fmt: str) -> Iterator[ImportRecord]:
+        """
+        Parse an uploaded byte stream lazily into records.
+
+        Args:
+            stream: Binary file object
+            fmt: 'csv' (with a header row) or 'ndjson' (one JSON object per line)
+
+        Yields:
+            (row number, record, error) tuples; row numbers start at 1 and are
+            line numbers for NDJSON, so blank lines still count
+        """
+        text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+        if fmt == 'csv':
+            for row_number, row in enumerate(csv.DictReader(text), start=1):
+                # Empty CSV cells mean "not provided"
+                yield row_number, {k: v for k, v in row.items() if k and v not in ('', None)}, None
+            return
+
+        for row_number, line in enumerate(text, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield row_number, None, f"Invalid JSON: {e}"
+                continue
+            if not isinstance(record, dict):
+                yield row_number, None, "Expected a JSON object"
+                continue
+            yield row_number, record, None
+
+    @staticmethod
+    def import_transactions(
+        db: Session,
+        records: Iterable[ImportRecord],
+        batch_size: int = 5000,
+        max_errors: int = 1000
+    ) -> dict:
+        """
+        Validate and bulk insert transactions.
+
+        Categories are resolved from an in-memory name/id map loaded once;
+        unknown category names are created in bulk per batch. Valid rows are
+        inserted with a single executemany per batch and committed together
+        with the matching daily_totals changes. If the stream cannot be decoded
+        any further, the batches read so far are still imported and the
+        failure is reported as an error on the row where reading stopped.
+
+        Args:
+            db: Database session
+            records: Records as produced by iter_records
+            batch_size: Rows per executemany/commit
+            max_errors: Maximum number of row errors reported back
+
+        Returns:
+            Dict with inserted, failed and errors (list of {row, errors})
+        """
+        category_ids = CategoryService.get_name_map(db)
+        known_ids = set(category_ids.values())
+
+        result = {'inserted': 0, 'failed': 0, 'errors': []}
+
+        def fail(row_number: int, messages: List[str]):
+            result['failed'] += 1
+            if len(result['errors']) < max_errors:
+                result['errors'].append({'row': row_number, 'errors': messages})
+
+        def flush(batch: List[Tuple[int, TransactionCreate]]):
+            # Pick up categories other workers created since the cache was loaded
+            CategoryService.resolve_missing(
+                db, category_ids, known_ids,
+                names={item.category for _, item in batch if item.category_id is None and item.category},
+                ids={item.category_id for _, item in batch if item.category_id is not None},
+            )
+            # Create categories referenced by name that don't exist yet, in one statement
+            new_categories = {}
+            for _, item in batch:
+                if item.category_id is None and item.category and item.category not in category_ids:
+                    new_categories.setdefault(item.category, item.is_income)
+            created = CategoryService.bulk_create_by_name(db, new_categories)
+            category_ids.update(created)
+            known_ids.update(created.values())
+
+            rows = []
+            for row_number, item in batch:
+                category_id = item.category_id
+                if category_id is None and item.category:
+                    category_id = category_ids.get(item.category)
+                if category_id is None:
+                    fail(row_number, ["category or category_id is required"])
+                    continue
+                if category_id not in known_ids:
+                    fail(row_number, ["Category not found"])
+                    continue
+                rows.append({
+                    'amount': item.amount,
+                    'category_id': category_id,
+                    'description': item.description,
+                    'is_income': item.is_income,
+                    'date': item.date,
+                })
+            if rows:
+                db.execute(insert(Transaction), rows)
+                deltas = RollupService.new_deltas()
+                for row in rows:
+                    RollupService.add(deltas, row['date'], row['category_id'], row['is_income'], row['amount'])
+                RollupService.apply(db, deltas)
+            db.commit()
+            result['inserted'] += len(rows)
+
+        batch: List[Tuple[int, TransactionCreate]] = []
+        last_row = 0
+        try:
+            try:
+                for row_number, record, error in records:
+                    last_row = row_number
+                    if error is not None:
+                        fail(row_number, [error])
+                        continue
+                    try:
+                        batch.append((row_number, TransactionCreate(**record)))
+                    except ValidationError as e:
+                        fail(row_number, [
+                            f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" if err['loc'] else err['msg']
+                            for err in e.errors()
+                        ])
+                        continue
+                    if len(batch) >= batch_size:
+                        flush(batch)
+                        batch = []
+            except (UnicodeDecodeError, csv.Error) as e:
+                # Earlier batches are already committed, so report what was imported
+                # rather than failing the whole request
+                fail(last_row + 1, [f"Could not parse the rest of the upload: {e}"])
+            if batch:
+                flush(batch)
+        except Exception:
+            db.rollback()
+            raise
+
+        return result
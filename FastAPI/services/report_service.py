@@ -0,0 +1,505 @@
+import asyncio
+import csv
+import datetime
+import io
+import multiprocessing
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional
+from fastapi import HTTPException
+from fastapi.responses import FileResponse, JSONResponse, Response
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import NullPool
+from config import settings
+from database import build_engine
+from services.transaction_service import TransactionService
+from services.version_service import VersionService
+
+CSV_HEADER = ['id', 'amount', 'category_id', 'category_name', 'description', 'is_income', 'date']
+
+REPORT_MEDIA_TYPES = {'csv': 'text/csv', 'pdf': 'application/pdf'}
+
+
+def iter_csv_chunks(db: Session, start_date: Optional[str], end_date: Optional[str]) -> Iterator[bytes]:
+    """Yield the CSV export as encoded chunks, one database batch at a time."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_HEADER)
+    yield buffer.getvalue().encode('utf-8')
+    for rows in TransactionService.iter_transaction_rows(db, start_date, end_date):
+        buffer.seek(0)
+        buffer.truncate(0)
+        writer.writerows(rows)
+        yield buffer.getvalue().encode('utf-8')
+
+
+# Landscape letter: x offset and width (points) of each PDF table column
+PDF_COLUMNS = [
+    ('ID', 36, 50),
+    ('Amount', 86, 80),
+    ('Category', 166, 130),
+    ('Description', 296, 320),
+    ('Type', 616, 60),
+    ('Date', 676, 80),
+]
+PDF_ROW_HEIGHT = 14
+PDF_FONT_SIZE = 9
+
+
+def _fit_text(text: str, width: float, font: str, size: int) -> str:
+    """Truncate text with an ellipsis so it fits in width points."""
+    from reportlab.pdfbase.pdfmetrics import stringWidth
+
+    # No Helvetica glyph is wider than the font size, so short strings always fit
+    if len(text) * size <= width or stringWidth(text, font, size) <= width:
+        return text
+    while text and stringWidth(text + '...', font, size) > width:
+        text = text[:-1]
+    return text + '...'
+
+
+def write_pdf(db: Session, start_date: Optional[str], end_date: Optional[str], out: BinaryIO) -> None:
+    """
+    Write the transactions PDF for a date range to out.
+
+    The first page summarises the range from the aggregate queries; the rows
+    follow, drawn a page at a time straight from the batched row iterator.
+    Nothing has to lay out the whole table up front, so memory stays bounded
+    and time grows linearly with the number of rows.
+    """
+    try:
+        from reportlab.lib.pagesizes import letter, landscape
+        from reportlab.pdfgen import canvas
+    except ImportError:
+        # Without reportlab, fall back to a plain text CSV-like body
+        for rows in TransactionService.iter_transaction_rows(db, start_date, end_date):
+            lines = []
+            for id_, amount, _, category, description, is_income, date in rows:
+                description = (description or '').replace('\n', ' ')
+                lines.append(f"{id_},{amount},{category or ''},{description},{is_income},{date}\n")
+            out.write(''.join(lines).encode('utf-8'))
+        return
+
+    page_width, page_height = landscape(letter)
+    top, bottom = page_height - 36, 36
+    pdf = canvas.Canvas(out, pagesize=(page_width, page_height), pageCompression=1)
+    pdf.setTitle('Transactions Report')
+    page_number = 1
+
+    def finish_page():
+        nonlocal page_number
+        pdf.setFont('Helvetica', 8)
+        pdf.drawRightString(page_width - 36, bottom - 18, f'Page {page_number}')
+        pdf.showPage()
+        page_number += 1
+
+    # Summary page
+    totals = TransactionService.get_report_totals(db, start_date, end_date)
+    pdf.setFont('Helvetica-Bold', 18)
+    pdf.drawString(36, top - 18, 'Transactions Report')
+    pdf.setFont('Helvetica', 10)
+    pdf.drawString(
+        36, top - 40, f'Date Range: {start_date or "-"} to {end_date or "-"}  Generated: {datetime.date.today()}'
+    )
+    y = top - 76
+    for label, value in (
+        ('Total income', f"{totals['total_income']:.2f}"),
+        ('Total expense', f"{totals['total_expense']:.2f}"),
+        ('Balance', f"{totals['balance']:.2f}"),
+        ('Transactions', str(totals['count'])),
+    ):
+        pdf.drawString(36, y, label)
+        pdf.drawRightString(236, y, value)
+        y -= PDF_ROW_HEIGHT
+
+    y -= PDF_ROW_HEIGHT
+    pdf.setFont('Helvetica-Bold', 10)
+    pdf.drawString(36, y, 'Category')
+    for text, x in (('Income', 336), ('Expense', 436), ('Count', 516)):
+        pdf.drawRightString(x, y, text)
+    pdf.setFont('Helvetica', 10)
+    for group in TransactionService.get_grouped_totals(db, 'category', None, start_date, end_date):
+        y -= PDF_ROW_HEIGHT
+        if y < bottom:
+            finish_page()
+            pdf.setFont('Helvetica', 10)
+            y = top
+        pdf.drawString(36, y, _fit_text(str(group['key']), 200, 'Helvetica', 10))
+        pdf.drawRightString(336, y, f"{group['total_income']:.2f}")
+        pdf.drawRightString(436, y, f"{group['total_expense']:.2f}")
+        pdf.drawRightString(516, y, str(group['count']))
+    finish_page()
+
+    # Detail pages
+    def draw_header() -> float:
+        pdf.setFillColorRGB(0.94, 0.94, 0.94)
+        pdf.rect(36, top - PDF_ROW_HEIGHT + 3, page_width - 72, PDF_ROW_HEIGHT, stroke=0, fill=1)
+        pdf.setFillColorRGB(0, 0, 0)
+        pdf.setFont('Helvetica-Bold', PDF_FONT_SIZE)
+        for title, x, _ in PDF_COLUMNS:
+            pdf.drawString(x + 2, top - PDF_ROW_HEIGHT + 7, title)
+        pdf.setFont('Helvetica', PDF_FONT_SIZE)
+        return top - 2 * PDF_ROW_HEIGHT + 7
+
+    y = None
+    for rows in TransactionService.iter_transaction_rows(db, start_date, end_date):
+        for id_, amount, _, category, description, is_income, date in rows:
+            if y is None or y < bottom:
+                if y is not None:
+                    finish_page()
+                y = draw_header()
+            values = (
+                str(id_),
+                f"{amount:.2f}",
+                category or '',
+                (description or '').replace('\n', ' '),
+                'Income' if is_income else 'Expense',
+                date,
+            )
+            for value, (_, x, width) in zip(values, PDF_COLUMNS):
+                pdf.drawString(x + 2, y, _fit_text(value, width - 4, 'Helvetica', PDF_FONT_SIZE))
+            y -= PDF_ROW_HEIGHT
+    if y is not None:
+        finish_page()
+    pdf.save()
+
+
+def build_pdf(db: Session, start_date: Optional[str], end_date: Optional[str]) -> bytes:
+    """Render the transactions PDF for a date range into memory."""
+    buffer = io.BytesIO()
+    write_pdf(db, start_date, end_date, buffer)
+    return buffer.getvalue()
+
+
+def _store_artifact(tmp_path: Path, path: Path) -> None:
+    """Atomically publish a rendered file and drop artifacts of older data versions."""
+    os.replace(tmp_path, path)
+    prefix = path.name.rsplit('_v', 1)[0]
+    for old in path.parent.glob(f"{prefix}_v*{path.suffix}"):
+        if old != path:
+            old.unlink(missing_ok=True)
+    _evict_artifacts(path.parent, keep=path)
+
+
+def _evict_artifacts(cache_dir: Path, keep: Path) -> None:
+    """Remove least recently used artifacts until the cache fits report_cache_max_bytes."""
+    artifacts = []
+    for entry in cache_dir.iterdir():
+        # Temp files of renders in progress start with a dot
+        if entry.name.startswith('.') or entry == keep:
+            continue
+        try:
+            stat = entry.stat()
+        except FileNotFoundError:
+            continue
+        artifacts.append((stat.st_mtime, stat.st_size, entry))
+    try:
+        total = keep.stat().st_size + sum(size for _, size, _ in artifacts)
+    except FileNotFoundError:
+        return
+    for _, size, entry in sorted(artifacts, key=lambda artifact: artifact[0]):
+        if total <= settings.report_cache_max_bytes:
+            break
+        entry.unlink(missing_ok=True)
+        total -= size
+
+
+def render_report_file(
+    database_url: str,
+    file_type: str,
+    start_date: Optional[str],
+    end_date: Optional[str],
+    path: str
+) -> str:
+    """
+    Render a CSV or PDF report to path.
+
+    Runs inside a report worker, so it opens its own connection from
+    database_url rather than sharing the request's session.
+    """
+    target = Path(path)
+    tmp_path = target.with_name(f".{target.name}.{uuid.uuid4().hex}.tmp")
+    # Same per-connection pragmas (busy_timeout etc.) as the API, without a pool
+    engine = build_engine(database_url, poolclass=NullPool)
+    db = sessionmaker(bind=engine)()
+    try:
+        with open(tmp_path, 'wb') as f:
+            if file_type == 'csv':
+                for chunk in iter_csv_chunks(db, start_date, end_date):
+                    f.write(chunk)
+            else:
+                write_pdf(db, start_date, end_date, f)
+        _store_artifact(tmp_path, target)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+        db.close()
+        engine.dispose()
+    return path
+
+
+class PendingFileResponse(Response):
+    """
+    Send a report file once its render future completes.
+
+    The wait happens on the event loop when the response is sent, so a slow
+    render doesn't hold one of the API's worker threads. Renders exceeding
+    report_timeout are cancelled and answered with 504.
+    """
+
+    def __init__(self, future: Future, path: Path, media_type: str, filename: str, headers: Optional[dict] = None):
+        super().__init__(media_type=media_type, headers=headers)
+        self.future = future
+        self.path = path
+        self.filename = filename
+        self.file_headers = headers
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await asyncio.wait_for(asyncio.wrap_future(self.future), timeout=settings.report_timeout)
+        except asyncio.TimeoutError:
+            self.future.cancel()
+            response = JSONResponse({'detail': "Report generation timed out"}, status_code=504)
+        else:
+            response = FileResponse(
+                self.path, media_type=self.media_type, filename=self.filename, headers=self.file_headers
+            )
+        await response(scope, receive, send)
+
+
+class ReportService:
+    """Service class running report rendering in a bounded worker pool, with cached artifacts."""
+
+    _executor: Optional[Executor] = None
+    _pending = 0
+    _lock = threading.Lock()
+    _jobs: "OrderedDict[str, dict]" = OrderedDict()
+    _inflight: dict = {}
+
+    @staticmethod
+    def _get_executor() -> Executor:
+        with ReportService._lock:
+            if ReportService._executor is None:
+                if settings.report_executor == "process":
+                    # Forking a multithreaded server with open sqlite3 connections can
+                    # deadlock the child; start workers from a fresh interpreter instead
+                    ReportService._executor = ProcessPoolExecutor(
+                        max_workers=settings.report_workers, mp_context=multiprocessing.get_context("spawn")
+                    )
+                else:
+                    ReportService._executor = ThreadPoolExecutor(
+                        max_workers=settings.report_workers, thread_name_prefix="report"
+                    )
+            return ReportService._executor
+
+    @staticmethod
+    def database_url(db: Session) -> str:
+        """URL a worker can use to open its own connection to the session's database."""
+        return db.get_bind().url.render_as_string(hide_password=False)
+
+    @staticmethod
+    def submit(fn, *args) -> Future:
+        """
+        Queue a report function on the worker pool.
+
+        Args:
+            fn: Picklable module-level function
+            *args: Arguments for fn
+
+        Returns:
+            Future for the function's result
+
+        Raises:
+            HTTPException: 503 if report_max_pending reports are already queued or running
+        """
+        with ReportService._lock:
+            if ReportService._pending >= settings.report_max_pending:
+                raise HTTPException(
+                    status_code=503,
+                    detail="Too many reports are being generated; try again shortly",
+                    headers={"Retry-After": "5"}
+                )
+            ReportService._pending += 1
+
+        def release(_):
+            with ReportService._lock:
+                ReportService._pending -= 1
+
+        try:
+            future = ReportService._get_executor().submit(fn, *args)
+        except Exception:
+            release(None)
+            raise
+        future.add_done_callback(release)
+        return future
+
+    @staticmethod
+    def artifact_path(
+        db: Session,
+        file_type: str,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None
+    ) -> Path:
+        """
+        Cache location of a report for the current data version.
+
+        The name is keyed by (file_type, start_date, end_date, data version), so
+        any write to transactions or categories makes older artifacts unreachable.
+        
+        Raises:
+            HTTPException: If a date is not in YYYY-MM-DD format
+        """
+        # Dates become part of the file name, so they must be validated first
+        TransactionService.validate_date_range(start_date, end_date)
+        version = VersionService.get_marker(db, 'transactions', 'categories')
+        cache_dir = Path(settings.report_cache_dir)
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        return cache_dir / f"{file_type}_{start_date or 'all'}_{end_date or 'all'}_v{version}.{file_type}"
+
+    @staticmethod
+    def is_cached(path: Path) -> bool:
+        """Check for a cached artifact, marking it as recently used."""
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    @staticmethod
+    def render_file(db: Session, file_type: str, start_date: Optional[str], end_date: Optional[str], path: Path) -> Future:
+        """
+        Start rendering a report to path in the worker pool.
+
+        Returns:
+            Future of the rendered path; serve it with PendingFileResponse
+
+        Raises:
+            HTTPException: 503 if the queue is full
+        """
+        return ReportService.submit(
+            render_report_file, ReportService.database_url(db), file_type, start_date, end_date, str(path)
+        )
+
+    @staticmethod
+    def stream_csv_to_cache(db: Session, start_date: Optional[str], end_date: Optional[str], path: Path) -> Iterator[bytes]:
+        """Stream the CSV export while also writing it to the report cache."""
+        tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            with open(tmp_path, 'wb') as f:
+                for chunk in iter_csv_chunks(db, start_date, end_date):
+                    f.write(chunk)
+                    yield chunk
+            _store_artifact(tmp_path, path)
+        finally:
+            # Only reached with the temp file present if the client went away mid-stream
+            tmp_path.unlink(missing_ok=True)
+
+    @staticmethod
+    def _job_status(job: dict) -> dict:
+        future = job['future']
+        status, error = 'done', None
+        if future is not None:
+            if future.done():
+                exc = None if future.cancelled() else future.exception()
+                if future.cancelled() or exc is not None:
+                    status, error = 'failed', str(exc) if exc else 'cancelled'
+            else:
+                status = 'running' if future.running() else 'queued'
+        return {
+            'id': job['id'],
+            'status': status,
+            'file_type': job['file_type'],
+            'start_date': job['start_date'],
+            'end_date': job['end_date'],
+            'error': error,
+        }
+
+    @staticmethod
+    def submit_job(db: Session, file_type: str, start_date: Optional[str] = None, end_date: Optional[str] = None) -> dict:
+        """
+        Create a report job.
+
+        If the artifact for the current data version is already cached the job
+        is done immediately; an identical job still in progress is reused.
+
+        Returns:
+            Job status dict (id, status, file_type, start_date, end_date, error)
+
+        Raises:
+            HTTPException: 503 if the worker queue is full
+        """
+        path = ReportService.artifact_path(db, file_type, start_date, end_date)
+        key = str(path)
+        with ReportService._lock:
+            job_id = ReportService._inflight.get(key)
+            if job_id in ReportService._jobs and not ReportService._jobs[job_id]['future'].done():
+                return ReportService._job_status(ReportService._jobs[job_id])
+
+        future = None
+        if not ReportService.is_cached(path):
+            future = ReportService.submit(
+                render_report_file, ReportService.database_url(db), file_type, start_date, end_date, key
+            )
+
+        job = {
+            'id': uuid.uuid4().hex,
+            'file_type': file_type,
+            'start_date': start_date,
+            'end_date': end_date,
+            'path': path,
+            'future': future,
+        }
+        with ReportService._lock:
+            ReportService._jobs[job['id']] = job
+            if future is not None:
+                ReportService._inflight[key] = job['id']
+            # Bounded job history
+            while len(ReportService._jobs) > settings.report_job_history:
+                old_id, old = ReportService._jobs.popitem(last=False)
+                if ReportService._inflight.get(str(old['path'])) == old_id:
+                    del ReportService._inflight[str(old['path'])]
+        return ReportService._job_status(job)
+
+    @staticmethod
+    def get_job(job_id: str) -> dict:
+        """
+        Get a report job's status.
+
+        Raises:
+            HTTPException: If the job is unknown
+        """
+        job = ReportService._jobs.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Report job not found")
+        return ReportService._job_status(job)
+
+    @staticmethod
+    def get_job_artifact(job_id: str) -> dict:
+        """
+        Get the finished artifact of a job as {path, file_type, filename}.
+
+        Raises:
+            HTTPException: 404 if unknown or the artifact was superseded, 409 if not finished
+        """
+        status = ReportService.get_job(job_id)
+        if status['status'] != 'done':
+            raise HTTPException(status_code=409, detail=f"Report job is {status['status']}")
+        job = ReportService._jobs[job_id]
+        if not job['path'].exists():
+            raise HTTPException(status_code=404, detail="Report artifact is no longer available; submit a new job")
+        return {
+            'path': job['path'],
+            'file_type': job['file_type'],
+            'filename': f"transactions_{job['start_date'] or 'all'}_{job['end_date'] or 'all'}.{job['file_type']}",
+        }
+
+    @staticmethod
+    def shutdown():
+        """Stop the worker pool (called on application shutdown)."""
+        with ReportService._lock:
+            executor, ReportService._executor = ReportService._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,143 @@
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import delete, func, insert, select, type_coerce, update, Integer
+from sqlalchemy.orm import Session
+from database import chunks
+from models import DailyTotal, Transaction, to_cents
+
+# (date, category_id, is_income) -> [total cents, count]
+RollupDeltas = Dict[Tuple[str, int, bool], List[int]]
+
+
+class RollupService:
+    """Service class maintaining the daily_totals rollup of transactions."""
+
+    @staticmethod
+    def new_deltas() -> RollupDeltas:
+        """Create an empty set of rollup changes."""
+        return defaultdict(lambda: [0, 0])
+
+    @staticmethod
+    def add(
+        deltas: RollupDeltas,
+        date: str,
+        category_id: int,
+        is_income: bool,
+        amount: float,
+        sign: int = 1
+    ) -> None:
+        """
+        Record a transaction being added (sign=1) or removed (sign=-1).
+
+        Args:
+            deltas: Changes collected so far
+            date: Transaction date (YYYY-MM-DD)
+            category_id: Transaction category ID
+            is_income: Whether the transaction is income
+            amount: Transaction amount
+            sign: 1 to add the transaction, -1 to remove it
+        """
+        totals = deltas[(date, category_id, bool(is_income))]
+        totals[0] += sign * to_cents(amount)
+        totals[1] += sign
+
+    @staticmethod
+    def add_transaction(deltas: RollupDeltas, transaction: Transaction, sign: int = 1) -> None:
+        """Record a Transaction (or any object with its fields) being added or removed."""
+        RollupService.add(
+            deltas, transaction.date, transaction.category_id, transaction.is_income, transaction.amount, sign
+        )
+
+    @staticmethod
+    def apply(db: Session, deltas: RollupDeltas) -> None:
+        """
+        Apply collected changes to daily_totals, without committing.
+
+        Call this in the same DB transaction as the transaction writes so the
+        rollup always matches. Rows whose count drops to zero are removed.
+
+        Args:
+            db: Database session
+            deltas: Changes collected with add()/add_transaction()
+        """
+        rows = [
+            {'date': date, 'category_id': category_id, 'is_income': is_income, 'total_cents': cents, 'count': count}
+            for (date, category_id, is_income), (cents, count) in deltas.items()
+            if cents or count
+        ]
+        if not rows:
+            return
+
+        table = DailyTotal.__table__
+        dialect = db.get_bind().dialect.name
+        if dialect in ('sqlite', 'postgresql'):
+            if dialect == 'sqlite':
+                from sqlalchemy.dialects.sqlite import insert as upsert
+            else:
+                from sqlalchemy.dialects.postgresql import insert as upsert
+            stmt = upsert(table)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.date, table.c.category_id, table.c.is_income],
+                set_={
+                    'total_cents': table.c.total_cents + stmt.excluded.total_cents,
+                    'count': table.c.count + stmt.excluded.count,
+                }
+            )
+            db.execute(stmt, rows)
+        else:
+            for row in rows:
+                result = db.execute(
+                    update(table)
+                    .where(
+                        table.c.date == row['date'],
+                        table.c.category_id == row['category_id'],
+                        table.c.is_income == row['is_income']
+                    )
+                    .values(total_cents=table.c.total_cents + row['total_cents'], count=table.c.count + row['count'])
+                )
+                if result.rowcount == 0:
+                    db.execute(insert(table).values(**row))
+
+        # Drop days that no longer have transactions
+        emptied = sorted({row['date'] for row in rows if row['count'] < 0})
+        for chunk in chunks(emptied):
+            db.execute(delete(table).where(table.c.date.in_(chunk), table.c.count <= 0))
+
+    @staticmethod
+    def rebuild(db: Session) -> int:
+        """
+        Recompute daily_totals from the transactions table, without committing.
+
+        Args:
+            db: Database session
+
+        Returns:
+            Number of rollup rows written
+        """
+        table = DailyTotal.__table__
+        db.execute(delete(table))
+        # Copy the raw integer day numbers and cents straight across
+        day = type_coerce(Transaction.date, Integer)
+        cents = type_coerce(Transaction.amount, Integer)
+        db.execute(
+            insert(table).from_select(
+                ['date', 'category_id', 'is_income', 'total_cents', 'count'],
+                select(day, Transaction.category_id, Transaction.is_income, func.sum(cents), func.count(Transaction.id))
+                .group_by(day, Transaction.category_id, Transaction.is_income)
+            )
+        )
+        return db.query(func.count()).select_from(table).scalar()
+
+    @staticmethod
+    def rebuild_if_missing(db: Session) -> Optional[int]:
+        """
+        Build the rollup for a database whose transactions predate it, and commit.
+
+        Returns:
+            Number of rollup rows written, or None if nothing had to be done
+        """
+        if db.query(DailyTotal.date).first() is not None or db.query(Transaction.id).first() is None:
+            return None
+        rows = RollupService.rebuild(db)
+        db.commit()
+        return rows
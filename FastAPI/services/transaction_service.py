@@ -1,8 +1,52 @@
-from sqlalchemy.orm import Session
-from typing import List, Optional
+import base64
+import binascii
+import json
+import re
+from datetime import date as date_type, timedelta
+from sqlalchemy import (
+    func, case, select, insert, update, delete, type_coerce, and_, or_, column, literal_column, table, Float, Integer
+)
+from sqlalchemy.orm import Session, joinedload
+from typing import Iterator, List, Optional, Tuple
 from fastapi import HTTPException
-from models import Transaction, Category
-from schemas import TransactionCreate, TransactionUpdate
+from database import chunks
+from models import Transaction, Category, DailyTotal, DayNumber, EPOCH_JULIAN_DAY, parse_date
+from schemas import TransactionCreate, TransactionUpdate, TransactionBatchRequest
+from services.category_service import CategoryCache, CategoryService
+from services.rollup_service import RollupService
+
+
+REPORT_GROUPINGS = ('category', 'month', 'week', 'day')
+SERIES_PERIODS = ('day', 'week', 'month')
+# Longest balance series returned; longer ranges need a coarser period
+MAX_SERIES_POINTS = 20000
+
+
+# Batch result order, and the fields a batch update may not set to null
+_BATCH_OPS = ('create', 'update', 'delete')
+_NOT_NULL_FIELDS = ('amount', 'category_id', 'is_income', 'date')
+
+# Columns of the plain row queries: (id, amount, category_id, category_name, description,
+# is_income, date), the field order of TransactionResponse and the CSV export
+_ROW_COLUMNS = (
+    Transaction.id,
+    Transaction.amount,
+    Transaction.category_id,
+    Category.name,
+    Transaction.description,
+    Transaction.is_income,
+    Transaction.date,
+)
+
+# Raw integer storage of DailyTotal.date (day number)
+_ROLLUP_DAY = type_coerce(DailyTotal.date, Integer)
+
+# FTS5 index over Transaction.description (see models.TRANSACTION_SEARCH_DDL)
+_SEARCH_INDEX = table('transactions_fts', column('rowid', Integer))
+_SEARCH_MATCH = literal_column('transactions_fts').op('MATCH')
+# FTS5's rank column is bm25(); lower is a better match
+_SEARCH_RANK = literal_column('transactions_fts.rank', Float)
+_SEARCH_TOKEN = re.compile(r'\w+')
 
 
 class TransactionService:
@@ -23,28 +67,29 @@ class TransactionService:
         Raises:
             HTTPException: If category not found
         """
+        transaction_dict = transaction.model_dump()
+        # Remove any transient 'category' field (name) so SQLAlchemy model doesn't receive unexpected keyword args
+        category_name = transaction_dict.pop('category', None)
         # Resolve category: allow passing category name in `category` or category_id
-        if getattr(transaction, 'category_id', None) is None and getattr(transaction, 'category', None):
+        if transaction_dict.get('category_id') is None and category_name:
             # find or create by name
-            cat = db.query(Category).filter(Category.name == transaction.category).first()
-            if not cat:
-                cat = Category(name=transaction.category, description=None, is_income=transaction.is_income)
+            cached = CategoryCache.get_by_name(db, category_name)
+            if cached is not None:
+                transaction_dict['category_id'] = cached.id
+            else:
+                cat = Category(name=category_name, description=None, is_income=transaction.is_income)
                 db.add(cat)
-                db.commit()
-                db.refresh(cat)
-            transaction_dict = transaction.model_dump()
-            transaction_dict['category_id'] = cat.id
-        else:
-            transaction_dict = transaction.model_dump()
-        # Remove any transient 'category' field (name) so SQLAlchemy model doesn't receive unexpected keyword args
-        transaction_dict.pop('category', None)
-        # Validate category exists
-        category = db.query(Category).filter(Category.id == transaction_dict.get('category_id')).first()
-        if not category:
+                db.flush()
+                transaction_dict['category_id'] = cat.id
+        elif CategoryCache.get_by_id(db, transaction_dict.get('category_id')) is None:
+            # Validate category exists
             raise HTTPException(status_code=404, detail="Category not found")
         
         db_transaction = Transaction(**transaction_dict)
         db.add(db_transaction)
+        deltas = RollupService.new_deltas()
+        RollupService.add_transaction(deltas, db_transaction)
+        RollupService.apply(db, deltas)
         db.commit()
         db.refresh(db_transaction)
         return db_transaction
@@ -61,7 +106,12 @@ class TransactionService:
         Returns:
             Transaction if found, None otherwise
         """
-        return db.query(Transaction).filter(Transaction.id == transaction_id).first()
+        return (
+            db.query(Transaction)
+            .options(joinedload(Transaction.category_obj))
+            .filter(Transaction.id == transaction_id)
+            .first()
+        )
     
     @staticmethod
     def get_transactions(
@@ -71,64 +121,515 @@ class TransactionService:
         is_income: Optional[bool] = None,
         category_id: Optional[int] = None,
         start_date: Optional[str] = None,
-        end_date: Optional[str] = None
+        end_date: Optional[str] = None,
+        after_id: Optional[int] = None
     ) -> List[Transaction]:
         """
         Get list of transactions with optional filters.
         
         Args:
             db: Database session
-            skip: Number of records to skip
+            skip: Number of records to skip (ignored when after_id is given)
             limit: Maximum number of records to return
             is_income: Filter by income/expense
             category_id: Filter by category ID
+            after_id: Keyset position; only transactions with a lower id are returned
             
         Returns:
             List of transactions
         """
-        query = db.query(Transaction)
+        # Load category names in the same query to avoid one SELECT per row
+        query = db.query(Transaction).options(joinedload(Transaction.category_obj))
+        return TransactionService._page(
+            query, skip, limit, is_income, category_id, start_date, end_date, after_id
+        ).all()
+
+    @staticmethod
+    def get_transaction_rows(
+        db: Session,
+        skip: int = 0,
+        limit: int = 100,
+        is_income: Optional[bool] = None,
+        category_id: Optional[int] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        after_id: Optional[int] = None
+    ) -> List[tuple]:
+        """
+        Get a page of transactions as plain row tuples, without building ORM objects.
+        
+        Takes the same filters as get_transactions. Each row is
+        (id, amount, category_id, category_name, description, is_income, date),
+        the field order of TransactionResponse.
+        
+        Returns:
+            List of row tuples
+        """
+        query = db.query(*_ROW_COLUMNS).outerjoin(Category, Category.id == Transaction.category_id)
+        page = TransactionService._page(query, skip, limit, is_income, category_id, start_date, end_date, after_id)
+        return [tuple(row) for row in page]
 
+    @staticmethod
+    def _page(
+        query,
+        skip: int,
+        limit: int,
+        is_income: Optional[bool],
+        category_id: Optional[int],
+        start_date: Optional[str],
+        end_date: Optional[str],
+        after_id: Optional[int]
+    ):
+        """Apply the list filters, newest-first ordering and offset/keyset pagination to a query."""
+        query = TransactionService._filter(query, is_income, category_id, start_date, end_date)
+        query = query.order_by(Transaction.id.desc())
+        if after_id is not None:
+            # Keyset pagination: seek on the primary key instead of scanning skipped rows
+            query = query.filter(Transaction.id < after_id)
+        else:
+            query = query.offset(skip)
+        return query.limit(limit)
+
+    @staticmethod
+    def _filter(
+        query,
+        is_income: Optional[bool],
+        category_id: Optional[int],
+        start_date: Optional[str],
+        end_date: Optional[str]
+    ):
+        """Apply the optional is_income, category and date range filters to a query."""
         if is_income is not None:
             query = query.filter(Transaction.is_income == is_income)
 
         if category_id is not None:
             query = query.filter(Transaction.category_id == category_id)
 
-        # Filter by date range if provided (dates stored as YYYY-MM-DD strings)
+        # Filter by date range if provided (compared as integer day numbers)
+        return TransactionService._filter_date_range(query, start_date, end_date)
+
+    @staticmethod
+    def encode_cursor(last_id: int, rank: Optional[float] = None) -> str:
+        """Encode the id (and search rank) of the last row of a page as an opaque cursor."""
+        position = {'id': last_id} if rank is None else {'id': last_id, 'rank': rank}
+        payload = json.dumps(position, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+    @staticmethod
+    def _decode_position(cursor: str) -> dict:
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            position = json.loads(base64.urlsafe_b64decode(padded))
+            last_id = position['id']
+        except (binascii.Error, ValueError, TypeError, KeyError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        if not isinstance(last_id, int):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        return position
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> int:
+        """
+        Decode a cursor produced by encode_cursor.
+        
+        Raises:
+            HTTPException: If the cursor is malformed
+        """
+        return TransactionService._decode_position(cursor)['id']
+
+    @staticmethod
+    def decode_search_cursor(cursor: str) -> Tuple[float, int]:
+        """
+        Decode a search cursor produced by encode_cursor(last_id, rank).
+        
+        Returns:
+            (rank, id) of the last row of the previous page
+        
+        Raises:
+            HTTPException: If the cursor is malformed or not a search cursor
+        """
+        position = TransactionService._decode_position(cursor)
+        rank = position.get('rank')
+        if not isinstance(rank, (int, float)) or isinstance(rank, bool):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        return float(rank), position['id']
+
+    @staticmethod
+    def search_match_expression(text: str) -> str:
+        """
+        Turn free text into an FTS5 query matching all of its words.
+        
+        Each word is quoted, so FTS5 operators and punctuation in the input are
+        searched for literally rather than parsed; the last word also matches as
+        a prefix, for search-as-you-type.
+        
+        Raises:
+            HTTPException: If the text contains no words
+        """
+        words = _SEARCH_TOKEN.findall(text)
+        if not words:
+            raise HTTPException(status_code=400, detail="Search text must contain at least one word")
+        return ' '.join(f'"{word}"' for word in words) + '*'
+
+    @staticmethod
+    def search_transaction_rows(
+        db: Session,
+        text: str,
+        limit: int = 50,
+        is_income: Optional[bool] = None,
+        category_id: Optional[int] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        after: Optional[Tuple[float, int]] = None
+    ) -> List[tuple]:
+        """
+        Full-text search over transaction descriptions, best matches first.
+        
+        Uses the SQLite FTS5 index, ranked by bm25 with newer transactions first
+        among equal ranks. Takes the same filters as get_transactions.
+        
+        Args:
+            db: Database session
+            text: Words to search for (all must match; the last may be a prefix)
+            limit: Maximum number of records to return
+            after: Keyset position (rank, id) from decode_search_cursor
+            
+        Returns:
+            List of row tuples in _ROW_COLUMNS order, followed by the rank
+            
+        Raises:
+            HTTPException: If the text has no words, or the database is not SQLite
+        """
+        if db.get_bind().dialect.name != 'sqlite':
+            raise HTTPException(status_code=501, detail="Full-text search requires SQLite (FTS5)")
+        query = (
+            db.query(*_ROW_COLUMNS, _SEARCH_RANK)
+            .select_from(_SEARCH_INDEX)
+            .join(Transaction, Transaction.id == _SEARCH_INDEX.c.rowid)
+            .outerjoin(Category, Category.id == Transaction.category_id)
+            .filter(_SEARCH_MATCH(TransactionService.search_match_expression(text)))
+        )
+        query = TransactionService._filter(query, is_income, category_id, start_date, end_date)
+        if after is not None:
+            rank, last_id = after
+            query = query.filter(or_(_SEARCH_RANK > rank, and_(_SEARCH_RANK == rank, Transaction.id < last_id)))
+        query = query.order_by(_SEARCH_RANK, Transaction.id.desc()).limit(limit)
+        return [tuple(row) for row in query]
+
+    @staticmethod
+    def validate_date_range(start_date: Optional[str], end_date: Optional[str]) -> None:
+        """
+        Check that optional range bounds are YYYY-MM-DD dates.
+        
+        Raises:
+            HTTPException: If a date is not in YYYY-MM-DD format
+        """
+        for value in (start_date, end_date):
+            if value is not None:
+                try:
+                    parse_date(value)
+                except ValueError:
+                    raise HTTPException(status_code=400, detail="Dates must be in YYYY-MM-DD format")
+
+    @staticmethod
+    def _filter_date_range(query, start_date: Optional[str], end_date: Optional[str], column=Transaction.date):
+        """
+        Apply an inclusive YYYY-MM-DD date range on column (Transaction.date by default) to a query.
+        
+        Raises:
+            HTTPException: If a date is not in YYYY-MM-DD format
+        """
+        TransactionService.validate_date_range(start_date, end_date)
         if start_date is not None:
-            query = query.filter(Transaction.date >= start_date)
+            query = query.filter(column >= start_date)
         if end_date is not None:
-            query = query.filter(Transaction.date <= end_date)
+            query = query.filter(column <= end_date)
+        return query
 
-        return query.order_by(Transaction.id.desc()).offset(skip).limit(limit).all()
+    @staticmethod
+    def get_report_totals(
+        db: Session,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None
+    ) -> dict:
+        """
+        Compute income/expense totals and row count in the database.
+
+        Runs a single grouped SUM query over the daily_totals rollup, so the
+        cost depends on the number of days in range, not transactions.
+
+        Args:
+            db: Database session
+            start_date: Inclusive start date (YYYY-MM-DD)
+            end_date: Inclusive end date (YYYY-MM-DD)
+
+        Returns:
+            Dict with total_income, total_expense, balance and count
+        """
+        query = db.query(
+            DailyTotal.is_income,
+            func.coalesce(func.sum(DailyTotal.total_cents), 0),
+            func.coalesce(func.sum(DailyTotal.count), 0)
+        )
+        query = TransactionService._filter_date_range(query, start_date, end_date, DailyTotal.date)
+
+        # Sum exact integer cents and convert once at the end
+        income_cents = 0
+        expense_cents = 0
+        count = 0
+        for is_income, total, rows in query.group_by(DailyTotal.is_income).all():
+            if is_income:
+                income_cents += total
+            else:
+                expense_cents += total
+            count += rows
+
+        return {
+            'total_income': income_cents / 100,
+            'total_expense': expense_cents / 100,
+            'balance': (income_cents - expense_cents) / 100,
+            'count': count
+        }
 
     @staticmethod
-    def get_transactions_aggregate(
+    def _period_expression(group_by: str):
+        """SQL expression bucketing DailyTotal.date by month, ISO week (Monday) or day."""
+        if group_by == 'month':
+            return func.strftime('%Y-%m', _ROLLUP_DAY + EPOCH_JULIAN_DAY)
+        if group_by == 'week':
+            # Day 0 (1970-01-01) was a Thursday; step back to the Monday of the week
+            monday = _ROLLUP_DAY - (_ROLLUP_DAY % 7 + 10) % 7
+            return type_coerce(monday, DayNumber)
+        return DailyTotal.date
+
+    @staticmethod
+    def get_grouped_totals(
         db: Session,
+        group_by: str,
+        is_income: Optional[bool] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None
+    ) -> List[dict]:
+        """
+        Compute totals bucketed by category, month, ISO week or day.
+
+        The grouping runs as a single GROUP BY query over the daily_totals rollup.
+
+        Args:
+            db: Database session
+            group_by: One of 'category', 'month', 'week', 'day'
+            is_income: Filter by income/expense
+            start_date: Inclusive start date (YYYY-MM-DD)
+            end_date: Inclusive end date (YYYY-MM-DD)
+
+        Returns:
+            List of dicts with key, category_id, total_income, total_expense, balance and count
+
+        Raises:
+            HTTPException: If group_by is not supported
+        """
+        if group_by not in REPORT_GROUPINGS:
+            raise HTTPException(status_code=400, detail=f"Unsupported group_by '{group_by}'")
+
+        income = func.coalesce(func.sum(case((DailyTotal.is_income == True, DailyTotal.total_cents), else_=0)), 0)
+        expense = func.coalesce(func.sum(case((DailyTotal.is_income == False, DailyTotal.total_cents), else_=0)), 0)
+        count = func.sum(DailyTotal.count)
+
+        if group_by == 'category':
+            keys = (DailyTotal.category_id, Category.name)
+            query = db.query(*keys, income, expense, count).outerjoin(
+                Category, Category.id == DailyTotal.category_id
+            )
+        else:
+            keys = (TransactionService._period_expression(group_by),)
+            query = db.query(*keys, income, expense, count)
+
+        if is_income is not None:
+            query = query.filter(DailyTotal.is_income == is_income)
+        query = TransactionService._filter_date_range(query, start_date, end_date, DailyTotal.date)
+
+        groups = []
+        for row in query.group_by(*keys).order_by(*keys).all():
+            if group_by == 'category':
+                category_id, name, income_cents, expense_cents, rows = row
+                key = name if name is not None else str(category_id)
+            else:
+                key, income_cents, expense_cents, rows = row
+                category_id = None
+                if group_by == 'week':
+                    key = TransactionService._week_key(date_type.fromisoformat(key))
+            groups.append({
+                'key': key,
+                'category_id': category_id,
+                'total_income': income_cents / 100,
+                'total_expense': expense_cents / 100,
+                'balance': (income_cents - expense_cents) / 100,
+                'count': rows
+            })
+        return groups
+
+    @staticmethod
+    def _week_key(monday: date_type) -> str:
+        year, week, _ = monday.isocalendar()
+        return f"{year}-W{week:02d}"
+
+    @staticmethod
+    def _period_floor(period: str, day: date_type) -> date_type:
+        """First day of the day/week/month period containing day."""
+        if period == 'month':
+            return day.replace(day=1)
+        if period == 'week':
+            return day - timedelta(days=day.weekday())
+        return day
+
+    @staticmethod
+    def _next_period(period: str, start: date_type) -> Optional[date_type]:
+        """First day of the period after the one starting at start, or None past date.max."""
+        try:
+            if period == 'month':
+                return (start + timedelta(days=32)).replace(day=1)
+            return start + timedelta(days=7 if period == 'week' else 1)
+        except OverflowError:
+            return None
+
+    @staticmethod
+    def get_balance_series(
+        db: Session,
+        period: str = 'day',
         start_date: Optional[str] = None,
         end_date: Optional[str] = None
     ) -> dict:
         """
-        Return aggregated totals for income and expenses and list of transactions in range.
+        Compute the net (income minus expense) and running balance per period.
+
+        The per-period nets and their cumulative sum are computed in one query
+        over the daily_totals rollup with a SUM() window function. The running
+        balance starts from the balance of everything before start_date, and
+        periods without transactions are filled in with a net of 0, so the
+        arrays cover every period of the range.
+
+        Args:
+            db: Database session
+            period: One of 'day', 'week', 'month'
+            start_date: Inclusive start date (YYYY-MM-DD); defaults to the first transaction
+            end_date: Inclusive end date (YYYY-MM-DD); defaults to the last transaction
+
+        Returns:
+            Dict with period, opening_balance and parallel keys, net and balance lists
+
+        Raises:
+            HTTPException: If period is not supported, a date is malformed or
+                the range has more than MAX_SERIES_POINTS periods
         """
-        query = db.query(Transaction)
+        if period not in SERIES_PERIODS:
+            raise HTTPException(status_code=400, detail=f"Unsupported period '{period}'")
+        TransactionService.validate_date_range(start_date, end_date)
+
+        signed = case((DailyTotal.is_income == True, DailyTotal.total_cents), else_=-DailyTotal.total_cents)
+        opening_cents = 0
         if start_date is not None:
-            query = query.filter(Transaction.date >= start_date)
-        if end_date is not None:
-            query = query.filter(Transaction.date <= end_date)
+            opening_cents = db.query(func.coalesce(func.sum(signed), 0)).filter(DailyTotal.date < start_date).scalar()
+
+        bucket = TransactionService._period_expression(period).label('bucket')
+        nets = TransactionService._filter_date_range(
+            db.query(bucket, func.sum(signed).label('net')), start_date, end_date, DailyTotal.date
+        ).group_by(bucket).subquery()
+        running = func.sum(nets.c.net).over(order_by=nets.c.bucket, rows=(None, 0))
+        rows = db.query(nets.c.bucket, nets.c.net, running).order_by(nets.c.bucket).all()
 
-        transactions = query.order_by(Transaction.id.desc()).all()
+        def period_start(key: str) -> date_type:
+            return date_type.fromisoformat(key + '-01' if period == 'month' else key)
 
-        total_income = sum(t.amount for t in transactions if t.is_income)
-        total_expense = sum(t.amount for t in transactions if not t.is_income)
+        by_start = {period_start(key): (net, opening_cents + total) for key, net, total in rows}
+        first = TransactionService._period_floor(period, parse_date(start_date)) if start_date else None
+        last = TransactionService._period_floor(period, parse_date(end_date)) if end_date else None
+        if rows:
+            first = first or period_start(rows[0][0])
+            last = last or period_start(rows[-1][0])
+        first, last = first or last, last or first
+
+        keys, net, balance = [], [], []
+        current, balance_cents = first, opening_cents
+        while current is not None and current <= last:
+            if len(keys) == MAX_SERIES_POINTS:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Range has more than {MAX_SERIES_POINTS} {period}s; use a shorter range or longer period"
+                )
+            net_cents, total = by_start.get(current, (0, balance_cents))
+            balance_cents = total
+            if period == 'month':
+                keys.append(current.strftime('%Y-%m'))
+            elif period == 'week':
+                keys.append(TransactionService._week_key(current))
+            else:
+                keys.append(current.isoformat())
+            net.append(net_cents / 100)
+            balance.append(balance_cents / 100)
+            current = TransactionService._next_period(period, current)
 
         return {
-            'transactions': transactions,
-            'total_income': total_income,
-            'total_expense': total_expense,
-            'balance': total_income - total_expense
+            'period': period,
+            'opening_balance': opening_cents / 100,
+            'keys': keys,
+            'net': net,
+            'balance': balance,
         }
+
+    @staticmethod
+    def get_transactions_aggregate(
+        db: Session,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        include_transactions: bool = False
+    ) -> dict:
+        """
+        Return aggregated totals for income and expenses in range.
+
+        Totals are computed in SQL. The transaction rows are only loaded
+        (under the 'transactions' key) when include_transactions is True.
+        """
+        result = TransactionService.get_report_totals(db, start_date, end_date)
+
+        if include_transactions:
+            query = db.query(Transaction).options(joinedload(Transaction.category_obj))
+            query = TransactionService._filter_date_range(query, start_date, end_date)
+            result['transactions'] = query.order_by(Transaction.id.desc()).all()
+
+        return result
     
+    @staticmethod
+    def iter_transaction_rows(
+        db: Session,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        batch_size: int = 1000
+    ) -> Iterator[List[tuple]]:
+        """
+        Stream transactions in range as batches of plain row tuples.
+
+        Rows are fetched with yield_per so only one batch is held in memory.
+        Each row is (id, amount, category_id, category_name, description, is_income, date).
+
+        Args:
+            db: Database session
+            start_date: Inclusive start date (YYYY-MM-DD)
+            end_date: Inclusive end date (YYYY-MM-DD)
+            batch_size: Number of rows fetched per batch
+
+        Yields:
+            Lists of at most batch_size row tuples, newest first
+        """
+        stmt = (
+            select(*_ROW_COLUMNS)
+            .outerjoin(Category, Category.id == Transaction.category_id)
+            .order_by(Transaction.id.desc())
+        )
+        stmt = TransactionService._filter_date_range(stmt, start_date, end_date)
+        result = db.execute(stmt.execution_options(yield_per=batch_size))
+        for partition in result.partitions():
+            yield [tuple(row) for row in partition]
+
     @staticmethod
     def update_transaction(
         db: Session,
@@ -157,12 +658,15 @@ class TransactionService:
         
         # Validate category if being updated
         if 'category_id' in update_data:
-            category = db.query(Category).filter(Category.id == update_data['category_id']).first()
-            if not category:
+            if CategoryCache.get_by_id(db, update_data['category_id']) is None:
                 raise HTTPException(status_code=404, detail="Category not found")
         
+        deltas = RollupService.new_deltas()
+        RollupService.add_transaction(deltas, db_transaction, sign=-1)
         for field, value in update_data.items():
             setattr(db_transaction, field, value)
+        RollupService.add_transaction(deltas, db_transaction)
+        RollupService.apply(db, deltas)
         
         db.commit()
         db.refresh(db_transaction)
@@ -187,7 +691,152 @@ class TransactionService:
         if not db_transaction:
             raise HTTPException(status_code=404, detail="Transaction not found")
         
+        deltas = RollupService.new_deltas()
+        RollupService.add_transaction(deltas, db_transaction, sign=-1)
         db.delete(db_transaction)
+        RollupService.apply(db, deltas)
         db.commit()
         return True
-
+    
+    @staticmethod
+    def _existing_rows(db: Session, ids: List[int]) -> dict:
+        """
+        Load the rollup fields of the transactions that exist, querying in IN (...) chunks.
+        
+        Returns:
+            Dict of id to a dict with date, category_id, is_income and amount
+        """
+        found = {}
+        unique = list(set(ids))
+        for chunk in chunks(unique):
+            rows = db.query(
+                Transaction.id, Transaction.date, Transaction.category_id, Transaction.is_income, Transaction.amount
+            ).filter(Transaction.id.in_(chunk))
+            for id_, date, category_id, is_income, amount in rows:
+                found[id_] = {'date': date, 'category_id': category_id, 'is_income': is_income, 'amount': amount}
+        return found
+    
+    @staticmethod
+    def apply_batch(db: Session, batch: TransactionBatchRequest) -> dict:
+        """
+        Apply creates, updates and deletes in a single DB transaction.
+        
+        Creates are inserted with one executemany. Updates to the same id take
+        effect in item order, and ids with the same final changes become one
+        UPDATE ... WHERE id IN (...); deletes become one DELETE ... WHERE id
+        IN (...). Items that fail validation (including nulls for required
+        fields) are skipped and reported; everything else is committed once.
+        
+        Args:
+            db: Database session
+            batch: Creates, updates and deletes
+            
+        Returns:
+            Dict with succeeded, failed and per-item results ordered by op and index
+        """
+        results = []
+        deltas = RollupService.new_deltas()
+        category_ids = CategoryService.get_name_map(db)
+        known_ids = set(category_ids.values())
+        
+        try:
+            # Pick up categories other workers created since the cache was loaded
+            CategoryService.resolve_missing(
+                db, category_ids, known_ids,
+                names={item.category for item in batch.create if item.category_id is None and item.category},
+                ids={item.category_id for item in batch.create if item.category_id is not None}
+                | {item.category_id for item in batch.update if item.category_id is not None},
+            )
+            
+            # Creates: resolve categories (creating unknown names once), then executemany
+            new_categories = {}
+            for item in batch.create:
+                if item.category_id is None and item.category and item.category not in category_ids:
+                    new_categories.setdefault(item.category, item.is_income)
+            created_categories = CategoryService.bulk_create_by_name(db, new_categories)
+            category_ids.update(created_categories)
+            known_ids.update(created_categories.values())
+            
+            rows = []
+            row_indexes = []
+            for index, item in enumerate(batch.create):
+                category_id = item.category_id if item.category_id is not None else category_ids.get(item.category)
+                if category_id is None or category_id not in known_ids:
+                    results.append({'op': 'create', 'index': index, 'id': None, 'ok': False, 'detail': "Category not found"})
+                    continue
+                rows.append({
+                    'amount': item.amount,
+                    'category_id': category_id,
+                    'description': item.description,
+                    'is_income': item.is_income,
+                    'date': item.date,
+                })
+                row_indexes.append(index)
+                RollupService.add(deltas, item.date, category_id, item.is_income, item.amount)
+            if rows:
+                created = db.execute(
+                    insert(Transaction).returning(Transaction.id, sort_by_parameter_order=True), rows
+                ).scalars().all()
+                for index, id_ in zip(row_indexes, created):
+                    results.append({'op': 'create', 'index': index, 'id': id_, 'ok': True, 'detail': None})
+            
+            # Updates: fold each id's updates, in item order, into its final changes,
+            # then group ids with identical final changes into a single UPDATE each
+            existing = TransactionService._existing_rows(db, [item.id for item in batch.update])
+            final_changes = {}
+            for index, item in enumerate(batch.update):
+                changes = item.model_dump(exclude_unset=True, exclude={'id'})
+                detail = None
+                if item.id not in existing:
+                    detail = "Transaction not found"
+                else:
+                    null_field = next((f for f in _NOT_NULL_FIELDS if f in changes and changes[f] is None), None)
+                    if null_field is not None:
+                        detail = f"{null_field} cannot be null"
+                    elif 'category_id' in changes and changes['category_id'] not in known_ids:
+                        detail = "Category not found"
+                if detail is not None:
+                    results.append({'op': 'update', 'index': index, 'id': item.id, 'ok': False, 'detail': detail})
+                    continue
+                final_changes.setdefault(item.id, {}).update(changes)
+                results.append({'op': 'update', 'index': index, 'id': item.id, 'ok': True, 'detail': None})
+            groups = {}
+            for id_, changes in final_changes.items():
+                row = existing[id_]
+                RollupService.add(deltas, row['date'], row['category_id'], row['is_income'], row['amount'], -1)
+                row.update(changes)
+                RollupService.add(deltas, row['date'], row['category_id'], row['is_income'], row['amount'])
+                if changes:
+                    groups.setdefault(tuple(sorted(changes.items())), []).append(id_)
+            for changes, ids in groups.items():
+                for chunk in chunks(ids):
+                    db.execute(
+                        update(Transaction).where(Transaction.id.in_(chunk)).values(**dict(changes)),
+                        execution_options={'synchronize_session': False}
+                    )
+            
+            # Deletes: one DELETE per IN (...) chunk
+            existing = TransactionService._existing_rows(db, batch.delete)
+            for row in existing.values():
+                RollupService.add(deltas, row['date'], row['category_id'], row['is_income'], row['amount'], -1)
+            for chunk in chunks(list(existing)):
+                db.execute(
+                    delete(Transaction).where(Transaction.id.in_(chunk)),
+                    execution_options={'synchronize_session': False}
+                )
+            for index, id_ in enumerate(batch.delete):
+                found = id_ in existing
+                results.append({
+                    'op': 'delete', 'index': index, 'id': id_, 'ok': found,
+                    'detail': None if found else "Transaction not found"
+                })
+            
+            RollupService.apply(db, deltas)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        
+        results.sort(key=lambda r: (_BATCH_OPS.index(r['op']), r['index']))
+        succeeded = sum(1 for r in results if r['ok'])
+        return {'succeeded': succeeded, 'failed': len(results) - succeeded, 'results': results}
@@ -0,0 +1,186 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from fastapi import Request, Response
+from sqlalchemy import event, insert, update
+from sqlalchemy.orm import Session
+from models import DataVersion
+
+# Tables whose writes are counted; data_versions itself is never tracked
+TRACKED_TABLES = ('transactions', 'categories')
+
+_CHANGED_KEY = 'changed_tables'
+_COMMITTING_KEY = 'committing_tables'
+
+# Callbacks run after a commit that wrote tracked tables: fn(session, table names)
+_commit_hooks: List[Callable[[Session, Set[str]], None]] = []
+
+
+def _fingerprint(versions: Dict[str, Tuple[int, Optional[datetime]]]) -> str:
+    raw = ';'.join(
+        f"{name}:{version}:{updated_at.isoformat() if updated_at else '-'}"
+        for name, (version, updated_at) in sorted(versions.items())
+    )
+    return hashlib.sha1(raw.encode()).hexdigest()[:16]
+
+
+class VersionService:
+    """Service class for per-table data versions used by caches and ETags."""
+
+    @staticmethod
+    def get_versions(db: Session, *names: str) -> Dict[str, Tuple[int, Optional[datetime]]]:
+        """
+        Get the current version and last change time of tables.
+
+        Args:
+            db: Database session
+            names: Table names
+
+        Returns:
+            Dict of table name to (version, updated_at); (0, None) if never written
+        """
+        rows = db.query(DataVersion).filter(DataVersion.name.in_(names)).all()
+        found = {row.name: (row.version, row.updated_at) for row in rows}
+        return {name: found.get(name, (0, None)) for name in names}
+
+    @staticmethod
+    def get_marker(db: Session, *names: str) -> str:
+        """
+        Get a short token that changes whenever any of the tables change.
+
+        The change times are included so a recreated database does not reuse
+        the markers of an older one.
+        """
+        return _fingerprint(VersionService.get_versions(db, *names))
+
+    @staticmethod
+    def cache_headers(db: Session, *names: str) -> Dict[str, str]:
+        """
+        Build ETag/Last-Modified validators for a response derived from tables.
+
+        Args:
+            db: Database session
+            names: Tables the response is computed from
+
+        Returns:
+            Response headers (ETag, Cache-Control and, once written, Last-Modified)
+        """
+        versions = VersionService.get_versions(db, *names)
+        headers = {
+            # Weak: the same data may be sent compressed or not
+            'ETag': f'W/"{_fingerprint(versions)}"',
+            # Let clients keep the body but revalidate on every use
+            'Cache-Control': 'no-cache',
+        }
+        changed = [updated_at for _, updated_at in versions.values() if updated_at is not None]
+        if changed:
+            headers['Last-Modified'] = format_datetime(max(changed).replace(tzinfo=timezone.utc), usegmt=True)
+        return headers
+
+    @staticmethod
+    def conditional_get(request: Request, response: Response, db: Session, *names: str) -> Optional[Response]:
+        """
+        Answer a conditional GET from the tables' versions.
+
+        Sets the validators on response. If the request's If-None-Match (or,
+        without it, If-Modified-Since) shows the client is up to date, returns
+        a 304 response for the handler to return instead of its body.
+
+        Args:
+            request: Incoming request
+            response: Response whose headers receive the validators
+            db: Database session
+            names: Tables the response is computed from
+
+        Returns:
+            304 response, or None if the body has to be sent
+        """
+        headers = VersionService.cache_headers(db, *names)
+        response.headers.update(headers)
+
+        if_none_match = request.headers.get('if-none-match')
+        if if_none_match is not None:
+            etag = headers['ETag'].removeprefix('W/')
+            tags = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+            fresh = '*' in tags or etag in tags
+        else:
+            fresh = False
+            if_modified_since = request.headers.get('if-modified-since')
+            if if_modified_since and 'Last-Modified' in headers:
+                try:
+                    fresh = parsedate_to_datetime(headers['Last-Modified']) <= parsedate_to_datetime(if_modified_since)
+                except (TypeError, ValueError):
+                    fresh = False
+        return Response(status_code=304, headers=headers) if fresh else None
+
+    @staticmethod
+    def bump(db: Session, *names: str) -> None:
+        """Increment the versions of tables within the session's current transaction."""
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        for name in names:
+            result = db.execute(
+                update(DataVersion)
+                .where(DataVersion.name == name)
+                .values(version=DataVersion.version + 1, updated_at=now)
+            )
+            if result.rowcount == 0:
+                db.execute(insert(DataVersion).values(name=name, version=1, updated_at=now))
+
+    @staticmethod
+    def on_commit(fn: Callable[[Session, Set[str]], None]) -> Callable[[Session, Set[str]], None]:
+        """
+        Register a callback for committed writes, e.g. to invalidate an in-process cache.
+
+        Args:
+            fn: Called as fn(session, tables) after a commit that changed any of the tables
+
+        Returns:
+            fn, so this can be used as a decorator
+        """
+        _commit_hooks.append(fn)
+        return fn
+
+
+def _mark_changed(session: Session, table_name: Optional[str]) -> None:
+    if table_name in TRACKED_TABLES:
+        session.info.setdefault(_CHANGED_KEY, set()).add(table_name)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flushed_tables(session, flush_context):
+    # new/dirty/deleted still describe the pre-flush state here
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        _mark_changed(session, getattr(obj, '__tablename__', None))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_bulk_statements(orm_execute_state):
+    # Bulk insert()/update()/delete() statements executed through the session
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, 'table', None)
+        _mark_changed(orm_execute_state.session, getattr(table, 'name', None))
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_changed_tables(session):
+    # commit() flushes after this hook runs, so flush first to see every pending change
+    session.flush()
+    changed = session.info.pop(_CHANGED_KEY, None)
+    if changed:
+        VersionService.bump(session, *sorted(changed))
+        session.info[_COMMITTING_KEY] = changed
+
+
+@event.listens_for(Session, "after_commit")
+def _run_commit_hooks(session):
+    changed = session.info.pop(_COMMITTING_KEY, None)
+    if changed:
+        for hook in _commit_hooks:
+            hook(session, changed)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_changed_tables(session, previous_transaction):
+    session.info.pop(_CHANGED_KEY, None)
+    session.info.pop(_COMMITTING_KEY, None)
@@ -0,0 +1,135 @@
+"""
+Slow-query log.
+
+SlowQueryLog hooks an engine's cursor events and keeps the statements that
+ran longer than a threshold — with their parameters, duration and, on SQLite,
+the EXPLAIN QUERY PLAN output — in a bounded ring buffer.
+"""
+
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+
+# Statements worth explaining; PRAGMA, BEGIN, COMMIT etc. have no plan
+_EXPLAINABLE = ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH', 'REPLACE')
+_MAX_PARAM_LENGTH = 200
+
+
+def _jsonable(value: Any) -> Any:
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, str):
+        return value if len(value) <= _MAX_PARAM_LENGTH else value[:_MAX_PARAM_LENGTH] + '...'
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(item) for item in value]
+    if isinstance(value, dict):
+        return {str(key): _jsonable(item) for key, item in value.items()}
+    return _jsonable(repr(value))
+
+
+def _explain_sqlite(cursor, statement: str, parameters) -> Optional[List[str]]:
+    """EXPLAIN QUERY PLAN lines for a statement, indented by plan depth."""
+    if not statement.lstrip().upper().startswith(_EXPLAINABLE):
+        return None
+    explain = cursor.connection.cursor()
+    # Skip any row-counting row_factory set on the connection
+    explain.row_factory = None
+    try:
+        rows = explain.execute('EXPLAIN QUERY PLAN ' + statement, parameters or ()).fetchall()
+    except Exception as e:  # noqa: BLE001 - the plan is best effort
+        return [f'(EXPLAIN failed: {e})']
+    finally:
+        explain.close()
+
+    depth = {0: -1}
+    lines = []
+    for node_id, parent, _, detail in rows:
+        depth[node_id] = depth.get(parent, -1) + 1
+        lines.append('  ' * depth[node_id] + detail)
+    return lines
+
+
+class SlowQueryLog:
+    """Ring buffer of statements slower than a threshold."""
+
+    def __init__(self, size: int = 200):
+        self.threshold_ms: Optional[float] = None
+        self._entries: deque = deque(maxlen=size)
+        self._lock = threading.Lock()
+        self._engines = []
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._engines)
+
+    def attach(self, engine, threshold_ms: float, size: Optional[int] = None) -> None:
+        """
+        Start logging statements on engine that take longer than threshold_ms.
+
+        Args:
+            engine: SQLAlchemy engine to watch
+            threshold_ms: Minimum duration (milliseconds) of a logged statement
+            size: Number of entries kept; the oldest are dropped first
+        """
+        self.threshold_ms = threshold_ms
+        if size is not None and size != self._entries.maxlen:
+            with self._lock:
+                self._entries = deque(self._entries, maxlen=size)
+        if engine not in self._engines:
+            event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+            event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+            self._engines.append(engine)
+
+    def detach(self, engine) -> None:
+        """Stop logging statements on engine."""
+        if engine in self._engines:
+            event.remove(engine, 'before_cursor_execute', self._before_cursor_execute)
+            event.remove(engine, 'after_cursor_execute', self._after_cursor_execute)
+            self._engines.remove(engine)
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """Logged statements, newest first."""
+        with self._lock:
+            return list(reversed(self._entries))
+
+    def clear(self) -> None:
+        """Drop all logged statements."""
+        with self._lock:
+            self._entries.clear()
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        # Per statement, so failed statements don't leave start times on the pooled connection
+        if context is not None:
+            context._slow_query_started = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, '_slow_query_started', None)
+        if started is None:
+            return
+        duration_ms = (time.perf_counter() - started) * 1000
+        if self.threshold_ms is None or duration_ms < self.threshold_ms:
+            return
+
+        # executemany runs one statement per parameter set; show the first
+        sample = parameters[0] if executemany and parameters else parameters
+        plan = None
+        if conn.dialect.name == 'sqlite':
+            plan = _explain_sqlite(cursor, statement, sample)
+        entry = {
+            'recorded_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'duration_ms': round(duration_ms, 3),
+            'statement': statement,
+            'parameters': _jsonable(sample),
+            'executemany': len(parameters) if executemany else None,
+            'plan': plan,
+        }
+        with self._lock:
+            self._entries.append(entry)
+
+
+# Attached to the application engine by database._init_engine when enabled
+slow_query_log = SlowQueryLog()
@@ -4,6 +4,7 @@ from sqlalchemy.orm import sessionmaker
 from fastapi.testclient import TestClient
 from database import Base, get_db
 from main import app
+from config import settings
 import os
 
 
@@ -29,6 +30,13 @@ def db_session():
         Base.metadata.drop_all(bind=engine)
 
 
+@pytest.fixture(autouse=True)
+def report_cache_dir(tmp_path, monkeypatch):
+    """Keep report artifacts of each test in its own directory."""
+    monkeypatch.setattr(settings, "report_cache_dir", str(tmp_path / "report_cache"))
+    return tmp_path / "report_cache"
+
+
 @pytest.fixture(scope="function")
 def client(db_session):
     """Create a test client with database dependency override."""
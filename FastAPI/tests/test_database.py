@@ -0,0 +1,77 @@
+from config import Settings
+from database import build_engine
+
+
+class TestBuildEngine:
+    """Test engine construction from settings."""
+
+    def test_sqlite_pragmas_applied_per_connection(self, tmp_path):
+        settings = Settings(sqlite_busy_timeout_ms=1234, sqlite_cache_size_kib=2048, sqlite_mmap_size=0)
+        engine = build_engine(f"sqlite:///{tmp_path / 'tuned.db'}", settings)
+        try:
+            raw = engine.raw_connection()
+            try:
+                cursor = raw.cursor()
+                pragma = lambda name: cursor.execute(f"PRAGMA {name}").fetchone()[0]
+                assert pragma("journal_mode") == "wal"
+                assert pragma("synchronous") == 1  # NORMAL
+                assert pragma("busy_timeout") == 1234
+                assert pragma("cache_size") == -2048
+                assert pragma("mmap_size") == 0
+            finally:
+                raw.close()
+        finally:
+            engine.dispose()
+
+    def test_pool_settings(self, tmp_path):
+        settings = Settings(db_pool_size=3, db_max_overflow=2, db_pool_recycle=60)
+        engine = build_engine(f"sqlite:///{tmp_path / 'pooled.db'}", settings)
+        try:
+            assert engine.pool.size() == 3
+            assert engine.pool._max_overflow == 2
+            assert engine.pool._recycle == 60
+        finally:
+            engine.dispose()
+
+    def test_null_pool_keeps_pragmas(self, tmp_path):
+        from sqlalchemy.pool import NullPool
+
+        settings = Settings(sqlite_busy_timeout_ms=4321)
+        engine = build_engine(f"sqlite:///{tmp_path / 'worker.db'}", settings, poolclass=NullPool)
+        try:
+            assert isinstance(engine.pool, NullPool)
+            with engine.connect() as conn:
+                assert conn.exec_driver_sql("PRAGMA busy_timeout").scalar() == 4321
+        finally:
+            engine.dispose()
+
+    def test_in_memory_sqlite(self):
+        engine = build_engine("sqlite://", Settings())
+        try:
+            with engine.connect() as conn:
+                assert conn.exec_driver_sql("SELECT 1").scalar() == 1
+        finally:
+            engine.dispose()
+
+
+class TestRouteHandlers:
+    """Database-bound handlers must not block the event loop."""
+
+    def test_db_handlers_run_in_threadpool(self):
+        import inspect
+        from fastapi.routing import APIRoute
+        from database import get_db
+        from routers import categories, transactions
+
+        def uses_db(dependant):
+            return any(d.call is get_db or uses_db(d) for d in dependant.dependencies)
+
+        routes = [
+            r for r in transactions.router.routes + categories.router.routes
+            if isinstance(r, APIRoute) and uses_db(r.dependant)
+        ]
+        assert routes
+        for route in routes:
+            # FastAPI runs plain def endpoints in its threadpool; async def would run
+            # the synchronous Session calls on the event loop itself.
+            assert not inspect.iscoroutinefunction(route.endpoint), route.path
@@ -0,0 +1,76 @@
+import json
+from fastapi import status
+
+
+class TestImportEndpoints:
+    """Test suite for the bulk import endpoint."""
+
+    def test_import_csv(self, client):
+        """Test importing CSV rows with category names and a bad row."""
+        content = (
+            "amount,category,description,is_income,date\n"
+            "10.5,Food,Lunch,false,2024-01-15\n"
+            "2500,Salary,Pay,true,2024-01-31\n"
+            "-3,Food,Bad amount,false,2024-01-16\n"
+            "7.25,Coffee,New category,false,2024-01-17\n"
+        )
+        response = client.post(
+            "/transactions/import",
+            files={"file": ("bank.csv", content, "text/csv")},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["inserted"] == 3
+        assert data["failed"] == 1
+        assert data["errors"][0]["row"] == 3
+        assert "amount" in data["errors"][0]["errors"][0]
+
+        rows = client.get("/transactions/").json()
+        assert {t["category"] for t in rows} == {"Food", "Salary", "Coffee"}
+
+    def test_import_ndjson(self, client):
+        """Test importing NDJSON with an unknown category id and invalid JSON."""
+        lines = [
+            json.dumps({"amount": 12, "category": "Transport", "date": "2024-02-01"}),
+            "",
+            "{not json",
+            json.dumps({"amount": 5, "category_id": 999, "date": "2024-02-02"}),
+            json.dumps({"amount": 8, "category": "Transport", "date": "2024-02-03"}),
+        ]
+        response = client.post(
+            "/transactions/import?format=ndjson",
+            files={"file": ("export.txt", "\n".join(lines), "text/plain")},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["inserted"] == 2
+        # NDJSON errors are reported by line number, blank lines included
+        assert [e["row"] for e in data["errors"]] == [3, 4]
+        assert data["errors"][1]["errors"] == ["Category not found"]
+
+    def test_import_reports_rows_kept_before_undecodable_bytes(self, client, db_session):
+        """Test that a decode error late in the upload keeps and reports the committed rows."""
+        from models import Transaction
+
+        rows = "".join(f"{i % 100 + 1},Food,Row {i},false,2024-01-15\n" for i in range(6000))
+        content = b"amount,category,description,is_income,date\n" + rows.encode() + b"5,Food,\xff,false,2024-01-15\n"
+        response = client.post(
+            "/transactions/import",
+            files={"file": ("bank.csv", content, "text/csv")},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        # Decoding reads ahead, so rows sharing a chunk with the bad byte are not imported
+        assert data["inserted"] >= 5000
+        assert data["inserted"] == db_session.query(Transaction).count()
+        assert data["failed"] == 1
+        assert data["errors"][0]["row"] == data["inserted"] + 1
+        assert data["errors"][0]["errors"][0].startswith("Could not parse the rest of the upload")
+
+    def test_import_unknown_format(self, client):
+        """Test that an upload without a recognizable format is rejected."""
+        response = client.post(
+            "/transactions/import",
+            files={"file": ("data.bin", b"\x00\x01", "application/octet-stream")},
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,112 @@
+import sqlite3
+import pytest
+from sqlalchemy import event
+from migrate_database import add_transaction_indexes
+from services.category_service import CategoryService
+from services.transaction_service import TransactionService
+from schemas import TransactionCreate
+
+
+INDEX_NAME = "ix_transactions_date_is_income"
+
+
+def query_plans(db_session, call):
+    """Run call() and return the EXPLAIN QUERY PLAN details of each SELECT it issues."""
+    statements = []
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+    
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        call()
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    
+    plans = []
+    raw = engine.raw_connection()
+    try:
+        for statement, parameters in statements:
+            rows = raw.cursor().execute(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+            plans.append(" | ".join(row[-1] for row in rows))
+    finally:
+        raw.close()
+    return plans
+
+
+class TestIndexes:
+    """Verify the planner uses indexed range scans for hot queries."""
+    
+    @pytest.fixture(autouse=True)
+    def seed(self, db_session, sample_transaction_data, sample_income_data):
+        TransactionService.create_transaction(db_session, TransactionCreate(**sample_transaction_data))
+        TransactionService.create_transaction(db_session, TransactionCreate(**sample_income_data))
+    
+    def test_report_totals_read_rollup_range(self, db_session):
+        plans = query_plans(
+            db_session,
+            lambda: TransactionService.get_report_totals(db_session, "2024-01-01", "2024-01-31")
+        )
+        assert len(plans) == 1
+        assert "SEARCH daily_totals USING PRIMARY KEY (date>? AND date<?)" in plans[0]
+        assert "transactions" not in plans[0]
+    
+    def test_grouped_totals_read_rollup_range(self, db_session):
+        plans = query_plans(
+            db_session,
+            lambda: TransactionService.get_grouped_totals(db_session, "month", start_date="2024-01-01")
+        )
+        assert "SEARCH daily_totals USING PRIMARY KEY (date>?)" in plans[0]
+    
+    def test_category_totals_read_rollup_range(self, db_session):
+        plans = query_plans(
+            db_session,
+            lambda: TransactionService.get_grouped_totals(db_session, "category", start_date="2024-01-01")
+        )
+        assert "SEARCH daily_totals USING PRIMARY KEY (date>?)" in plans[0]
+        assert "transactions" not in plans[0]
+    
+    def test_list_date_range_uses_date_index(self, db_session):
+        plans = query_plans(
+            db_session,
+            lambda: TransactionService.get_transaction_rows(
+                db_session, start_date="2024-01-01", end_date="2024-01-31"
+            )
+        )
+        assert len(plans) == 1
+        assert f"SEARCH transactions USING INDEX {INDEX_NAME} (date>? AND date<?)" in plans[0]
+    
+    def test_list_category_and_date_uses_category_index(self, db_session):
+        category_id = CategoryService.get_category_by_name(db_session, "Food").id
+        plans = query_plans(
+            db_session,
+            lambda: TransactionService.get_transaction_rows(
+                db_session, category_id=category_id, start_date="2024-01-01"
+            )
+        )
+        assert len(plans) == 1
+        assert "SEARCH transactions USING INDEX ix_transactions_category_date (category_id=? AND date>?)" in plans[0]
+    
+    def test_export_date_range_uses_date_index(self, db_session):
+        plans = query_plans(
+            db_session,
+            lambda: list(TransactionService.iter_transaction_rows(db_session, "2024-01-01", "2024-01-31"))
+        )
+        assert plans
+        for plan in plans:
+            assert f"SEARCH transactions USING INDEX {INDEX_NAME} (date>? AND date<?)" in plan
+    
+    def test_migration_adds_indexes(self, tmp_path):
+        conn = sqlite3.connect(tmp_path / "old.db")
+        cursor = conn.cursor()
+        cursor.execute(
+            "CREATE TABLE transactions (id INTEGER PRIMARY KEY, amount REAL, category_id INTEGER, "
+            "description TEXT, is_income BOOLEAN, date TEXT)"
+        )
+        add_transaction_indexes(cursor)
+        add_transaction_indexes(cursor)  # idempotent
+        names = [row[0] for row in cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index'")]
+        conn.close()
+        assert INDEX_NAME in names
+        assert "ix_transactions_category_date" in names
@@ -0,0 +1,83 @@
+import re
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+
+from metrics import RequestStats, _current, instrument_engine, reset_metrics, uninstrument_engine
+
+
+@pytest.fixture(autouse=True)
+def instrumented_engine(db_session):
+    """Instrument the test engine, as database._init_engine does for the app engine."""
+    engine = db_session.get_bind()
+    instrument_engine(engine)
+    # Reconnect so the row-counting hook applies to new connections
+    db_session.close()
+    engine.dispose()
+    yield engine
+    uninstrument_engine(engine)
+    engine.dispose()
+
+
+class TestRequestMetrics:
+    """Tests for Server-Timing headers and the /metrics endpoint."""
+
+    def test_server_timing_counts_queries(self, client, sample_transaction_data):
+        """Responses report app time, DB time and the statements they ran."""
+        client.post("/transactions/", json=sample_transaction_data)
+        response = client.get("/transactions/")
+        assert response.status_code == 200
+
+        timing = response.headers["server-timing"]
+        assert re.match(r'app;dur=[\d.]+, db;dur=[\d.]+;desc="(\d+) queries, (\d+) rows"$', timing)
+        queries, rows = map(int, re.search(r'"(\d+) queries, (\d+) rows"', timing).groups())
+        assert queries >= 1
+        assert rows >= 1
+
+    def test_metrics_histograms_per_route(self, client, sample_transaction_data):
+        """Requests are recorded under their route template, not the raw path."""
+        reset_metrics()
+        created = client.post("/transactions/", json=sample_transaction_data).json()
+        client.get(f"/transactions/{created['id']}")
+        client.get("/transactions/999999")
+        client.get("/no-such-path")
+
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        body = response.text
+
+        assert 'http_requests_total{method="GET",route="/transactions/{transaction_id}",status="200"} 1' in body
+        assert 'http_requests_total{method="GET",route="/transactions/{transaction_id}",status="404"} 1' in body
+        assert 'http_requests_total{method="GET",route="unmatched",status="404"} 1' in body
+        assert f"/transactions/{created['id']}" not in body
+        assert 'http_request_duration_seconds_count{method="GET",route="/transactions/{transaction_id}"} 2' in body
+        assert 'http_request_db_statements_bucket{method="POST",route="/transactions/",le="+Inf"} 1' in body
+        assert "# TYPE http_request_db_rows histogram" in body
+
+    def test_other_engines_are_not_instrumented(self, tmp_path):
+        """Engines other than the app engine keep sqlite3's default row handling."""
+        engine = create_engine(f"sqlite:///{tmp_path / 'other.db'}")
+        try:
+            with engine.connect() as conn:
+                assert conn.connection.driver_connection.row_factory is None
+        finally:
+            engine.dispose()
+
+    def test_failed_statements_leave_no_state_on_connection(self, instrumented_engine):
+        """A statement that raises is not timed and leaves nothing on the pooled connection."""
+        stats = RequestStats()
+        token = _current.set(stats)
+        try:
+            with instrumented_engine.connect() as conn:
+                snapshot = lambda: {key: repr(value) for key, value in conn.info.items()}
+                info = snapshot()
+                for _ in range(3):
+                    with pytest.raises(OperationalError):
+                        conn.exec_driver_sql("SELECT * FROM no_such_table")
+                assert snapshot() == info
+                conn.exec_driver_sql("SELECT 1").fetchall()
+        finally:
+            _current.reset(token)
+        assert stats.statements == 1
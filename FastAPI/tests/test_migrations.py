@@ -0,0 +1,68 @@
+import sqlite3
+from migrate_database import upgrade_schema
+
+
+def create_legacy_db(path):
+    """Create a database with REAL amounts and TEXT dates, as older versions did."""
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE categories (id INTEGER PRIMARY KEY, name TEXT NOT NULL, description TEXT,
+                                 is_income BOOLEAN NOT NULL DEFAULT 0, is_default BOOLEAN NOT NULL DEFAULT 0);
+        CREATE TABLE transactions (id INTEGER PRIMARY KEY AUTOINCREMENT, amount REAL NOT NULL,
+                                   category_id INTEGER NOT NULL, description TEXT,
+                                   is_income BOOLEAN NOT NULL DEFAULT 0, date TEXT NOT NULL);
+        INSERT INTO categories (id, name) VALUES (1, 'Food');
+        INSERT INTO transactions (id, amount, category_id, description, is_income, date)
+        VALUES (7, 100.5, 1, 'Lunch', 0, '2024-01-15'), (9, 0.29, 1, NULL, 1, '1969-12-31');
+    """)
+    conn.commit()
+    return conn
+
+
+class TestUpgradeSchema:
+    """Test upgrading legacy SQLite databases in place."""
+
+    def test_converts_to_integer_storage(self, tmp_path):
+        conn = create_legacy_db(tmp_path / "legacy.db")
+        try:
+            assert upgrade_schema(conn) is True
+            rows = conn.execute(
+                "SELECT id, amount, typeof(amount), date, typeof(date) FROM transactions ORDER BY id"
+            ).fetchall()
+            assert rows == [(7, 10050, "integer", 19737, "integer"), (9, 29, "integer", -1, "integer")]
+            indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+            assert {"ix_transactions_date_is_income", "ix_transactions_category_date"} <= indexes
+
+            # Second run is a no-op
+            assert upgrade_schema(conn) is False
+        finally:
+            conn.close()
+
+    def test_normalizes_or_sets_aside_malformed_dates(self, tmp_path):
+        conn = create_legacy_db(tmp_path / "legacy.db")
+        try:
+            conn.execute("INSERT INTO transactions (id, amount, category_id, is_income, date) "
+                         "VALUES (10, 1, 1, 0, '2024-1-5'), (11, 2, 1, 0, 'someday')")
+            assert upgrade_schema(conn) is True
+            dates = dict(conn.execute("SELECT id, date FROM transactions").fetchall())
+            assert dates == {7: 19737, 9: -1, 10: 19727}
+            assert conn.execute("SELECT id, date FROM transactions_invalid").fetchall() == [(11, "someday")]
+        finally:
+            conn.close()
+
+    def test_builds_search_index(self, tmp_path):
+        conn = create_legacy_db(tmp_path / "legacy.db")
+        try:
+            upgrade_schema(conn)
+            search = "SELECT rowid FROM transactions_fts WHERE transactions_fts MATCH ?"
+            assert conn.execute(search, ("lunch",)).fetchall() == [(7,)]
+
+            # Triggers keep the index in sync with later writes
+            conn.execute("UPDATE transactions SET description = 'Team dinner' WHERE id = 7")
+            conn.execute("INSERT INTO transactions (amount, category_id, description, is_income, date) "
+                         "VALUES (500, 1, 'Dinner out', 0, 19740)")
+            assert conn.execute(search, ("lunch",)).fetchall() == []
+            assert len(conn.execute(search, ("dinner",)).fetchall()) == 2
+            conn.execute("INSERT INTO transactions_fts (transactions_fts) VALUES ('integrity-check')")
+        finally:
+            conn.close()
@@ -0,0 +1,77 @@
+import threading
+
+import pytest
+
+from config import settings
+from profiling import ProfileSession, profiler
+
+ADMIN = {"X-Admin-Token": "secret"}
+
+
+@pytest.fixture
+def admin_token(monkeypatch):
+    monkeypatch.setattr(settings, "admin_token", "secret")
+
+
+def busy_loop(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+class TestProfiling:
+    """Tests for the stack-sampling profiler and POST /admin/profile."""
+
+    def test_requires_admin_token(self, client, monkeypatch):
+        """Admin endpoints are off without ADMIN_TOKEN and need the matching header."""
+        assert client.post("/admin/profile", params={"seconds": 0.1}).status_code == 403
+        monkeypatch.setattr(settings, "admin_token", "secret")
+        response = client.post("/admin/profile", params={"seconds": 0.1}, headers={"X-Admin-Token": "wrong"})
+        assert response.status_code == 403
+
+    def test_timed_session_samples_busy_threads(self):
+        """Collapsed stacks name the functions running in other threads."""
+        stop = threading.Event()
+        worker = threading.Thread(target=busy_loop, args=(stop,), name="busy-worker")
+        worker.start()
+        session = ProfileSession(seconds=0.2, interval=0.002)
+        try:
+            session.start()
+            assert session.done.wait(5)
+        finally:
+            session.stop()
+            stop.set()
+            worker.join()
+
+        assert session.samples > 0
+        busy = [line for line in session.collapsed().splitlines() if line.startswith("busy-worker;")]
+        assert busy and all("test_profiling.py:busy_loop" in line for line in busy)
+        assert "test_profiling.py:busy_loop" in session.top()
+
+    def test_route_session_counts_matching_requests(self, client, admin_token):
+        """A route session ends after the requested number of requests to that route."""
+        session = profiler.start(route="/transactions/{transaction_id}", requests=2, timeout=10)
+        try:
+            client.get("/transactions/")
+            assert not session.done.is_set()
+            client.get("/transactions/1")
+            client.get("/transactions/2")
+            assert session.done.wait(5)
+            assert session.completed == 2
+            assert not session.timed_out
+
+            # Only one session runs at a time
+            response = client.post("/admin/profile", params={"seconds": 1}, headers=ADMIN)
+            assert response.status_code == 409
+        finally:
+            profiler.finish(session)
+
+    def test_profile_endpoint(self, client, admin_token):
+        """A timed profile returns text and the sample count."""
+        response = client.post("/admin/profile", params={"seconds": 0.1, "format": "top"}, headers=ADMIN)
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert int(response.headers["x-profile-samples"]) > 0
+        assert "self    total  function" in response.text
+
+        response = client.post("/admin/profile", params={"seconds": 1, "route": "/health"}, headers=ADMIN)
+        assert response.status_code == 400
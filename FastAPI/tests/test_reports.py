@@ -44,3 +44,239 @@ class TestReportsEndpoints:
         data = resp.json()
         # sample_income_data is on 2024-01-01
         assert data['count'] >= 1
+
+    def test_aggregate_totals(self, client, sample_transaction_data, sample_income_data):
+        client.post('/transactions/', json=sample_transaction_data)
+        client.post('/transactions/', json=sample_income_data)
+
+        resp = client.get('/transactions/reports/aggregate')
+        assert resp.status_code == status.HTTP_200_OK
+        data = resp.json()
+        assert data['total_income'] == sample_income_data['amount']
+        assert data['total_expense'] == sample_transaction_data['amount']
+        assert data['balance'] == sample_income_data['amount'] - sample_transaction_data['amount']
+        assert data['count'] == 2
+
+    def test_aggregate_empty_range(self, client, sample_transaction_data):
+        client.post('/transactions/', json=sample_transaction_data)
+
+        resp = client.get('/transactions/reports/aggregate?start_date=2030-01-01')
+        assert resp.status_code == status.HTTP_200_OK
+        data = resp.json()
+        assert data['total_income'] == 0
+        assert data['total_expense'] == 0
+        assert data['count'] == 0
+
+    def test_grouped_by_category_and_month(self, client, sample_transaction_data, sample_income_data):
+        client.post('/transactions/', json=sample_transaction_data)
+        client.post('/transactions/', json={**sample_transaction_data, 'amount': 20.0, 'date': '2024-02-03'})
+        client.post('/transactions/', json=sample_income_data)
+
+        resp = client.get('/transactions/reports/grouped?group_by=category')
+        assert resp.status_code == status.HTTP_200_OK
+        groups = {g['key']: g for g in resp.json()}
+        assert groups['Food']['total_expense'] == 120.5
+        assert groups['Food']['count'] == 2
+        assert groups['Salary']['total_income'] == sample_income_data['amount']
+
+        resp = client.get('/transactions/reports/grouped?group_by=month&is_income=false')
+        assert resp.status_code == status.HTTP_200_OK
+        assert [(g['key'], g['total_expense']) for g in resp.json()] == [('2024-01', 100.5), ('2024-02', 20.0)]
+
+    def test_grouped_by_week_and_day(self, client, sample_transaction_data):
+        # 2024-01-14 is a Sunday (ISO week 2), 2024-01-15 a Monday (ISO week 3)
+        client.post('/transactions/', json={**sample_transaction_data, 'date': '2024-01-14'})
+        client.post('/transactions/', json={**sample_transaction_data, 'date': '2024-01-15'})
+        client.post('/transactions/', json={**sample_transaction_data, 'date': '2024-01-21'})
+
+        resp = client.get('/transactions/reports/grouped?group_by=week')
+        assert resp.status_code == status.HTTP_200_OK
+        assert [(g['key'], g['count']) for g in resp.json()] == [('2024-W02', 1), ('2024-W03', 2)]
+
+        resp = client.get('/transactions/reports/grouped?group_by=day&start_date=2024-01-15')
+        assert [g['key'] for g in resp.json()] == ['2024-01-15', '2024-01-21']
+
+        resp = client.get('/transactions/reports/grouped?group_by=year')
+        assert resp.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    def test_balance_series(self, client, sample_transaction_data, sample_income_data):
+        client.post('/transactions/', json=sample_income_data)  # +5000 on 2024-01-01
+        client.post('/transactions/', json=sample_transaction_data)  # -100.5 on 2024-01-15
+        client.post('/transactions/', json={**sample_transaction_data, 'amount': 20.0, 'date': '2024-03-02'})
+
+        resp = client.get('/transactions/reports/balance?period=month')
+        assert resp.status_code == status.HTTP_200_OK
+        assert resp.json() == {
+            'period': 'month',
+            'opening_balance': 0,
+            'keys': ['2024-01', '2024-02', '2024-03'],
+            'net': [4899.5, 0, -20.0],
+            'balance': [4899.5, 4899.5, 4879.5],
+        }
+
+        # Days without transactions are filled in; earlier days make up the opening balance
+        resp = client.get('/transactions/reports/balance?period=day&start_date=2024-01-14&end_date=2024-01-16')
+        data = resp.json()
+        assert data['opening_balance'] == 5000
+        assert data['keys'] == ['2024-01-14', '2024-01-15', '2024-01-16']
+        assert data['net'] == [0, -100.5, 0]
+        assert data['balance'] == [5000, 4899.5, 4899.5]
+
+        resp = client.get('/transactions/reports/balance?period=week&start_date=2024-01-10&end_date=2024-01-22')
+        data = resp.json()
+        assert data['keys'] == ['2024-W02', '2024-W03', '2024-W04']
+        assert data['balance'] == [5000, 4899.5, 4899.5]
+
+    def test_balance_series_limits(self, client, sample_transaction_data):
+        resp = client.get('/transactions/reports/balance')
+        assert resp.json()['keys'] == []
+
+        resp = client.get('/transactions/reports/balance?period=day&start_date=1900-01-01&end_date=2024-01-01')
+        assert resp.status_code == status.HTTP_400_BAD_REQUEST
+        resp = client.get('/transactions/reports/balance?period=year')
+        assert resp.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+        # Ranges ending in the last representable period stop there
+        resp = client.get('/transactions/reports/balance?period=day&start_date=9999-12-30&end_date=9999-12-31')
+        assert resp.json()['keys'] == ['9999-12-30', '9999-12-31']
+        resp = client.get('/transactions/reports/balance?period=month&start_date=9999-11-01&end_date=9999-12-31')
+        assert resp.json()['keys'] == ['9999-11', '9999-12']
+        resp = client.get('/transactions/reports/balance?period=week&start_date=9999-12-31')
+        assert resp.json()['keys'] == ['9999-W52']
+
+    def test_download_csv_contents(self, client, sample_transaction_data, sample_income_data):
+        client.post('/transactions/', json=sample_transaction_data)
+        client.post('/transactions/', json=sample_income_data)
+
+        resp = client.get('/transactions/reports/download?file_type=csv&start_date=2024-01-10')
+        assert resp.status_code == status.HTTP_200_OK
+        rows = list(csv.reader(io.StringIO(resp.content.decode('utf-8'))))
+        assert rows[0] == ['id', 'amount', 'category_id', 'category_name', 'description', 'is_income', 'date']
+        assert len(rows) == 2
+        assert rows[1][1:] == ['100.5', rows[1][2], 'Food', 'Lunch', 'False', '2024-01-15']
+
+    def test_aggregate_is_exact(self, client, sample_transaction_data, sample_income_data):
+        for amount in (0.1, 0.2):
+            client.post('/transactions/', json={**sample_income_data, 'amount': amount})
+        client.post('/transactions/', json={**sample_transaction_data, 'amount': 0.1})
+
+        data = client.get('/transactions/reports/aggregate').json()
+        assert data['total_income'] == 0.3
+        assert data['balance'] == 0.2
+
+        data = client.get('/transactions/reports/grouped?group_by=month').json()
+        assert data[0]['balance'] == 0.2
+
+    def test_invalid_report_date(self, client):
+        resp = client.get('/transactions/reports/aggregate?start_date=January')
+        assert resp.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_download_pdf_rendered_in_worker(self, client, sample_transaction_data):
+        client.post('/transactions/', json=sample_transaction_data)
+
+        resp = client.get('/transactions/reports/download?file_type=pdf')
+        assert resp.status_code == status.HTTP_200_OK
+        assert resp.content.startswith(b'%PDF')
+
+    def test_download_pdf_queue_full(self, client, monkeypatch):
+        from config import settings
+        monkeypatch.setattr(settings, 'report_max_pending', 0)
+
+        resp = client.get('/transactions/reports/download?file_type=pdf')
+        assert resp.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert resp.headers.get('retry-after') == '5'
+
+    def test_download_pdf_timeout(self, client, sample_transaction_data, report_cache_dir, monkeypatch):
+        from config import settings
+        client.post('/transactions/', json=sample_transaction_data)
+        monkeypatch.setattr(settings, 'report_timeout', 0)
+
+        resp = client.get('/transactions/reports/download?file_type=pdf')
+        assert resp.status_code == status.HTTP_504_GATEWAY_TIMEOUT
+        assert resp.json() == {'detail': 'Report generation timed out'}
+
+    def test_download_served_from_cache_until_data_changes(self, client, sample_transaction_data, report_cache_dir):
+        client.post('/transactions/', json=sample_transaction_data)
+
+        first = client.get('/transactions/reports/download?file_type=csv')
+        assert first.status_code == status.HTTP_200_OK
+        cached = list(report_cache_dir.glob('csv_all_all_v*.csv'))
+        assert len(cached) == 1
+
+        second = client.get('/transactions/reports/download?file_type=csv')
+        assert second.content == first.content
+        assert 'attachment' in second.headers.get('content-disposition', '')
+
+        # A write bumps the data version, so the next download is rebuilt
+        client.post('/transactions/', json=sample_transaction_data)
+        third = client.get('/transactions/reports/download?file_type=csv')
+        assert len(list(csv.reader(io.StringIO(third.content.decode('utf-8'))))) == 3
+        rebuilt = list(report_cache_dir.glob('csv_all_all_v*.csv'))
+        assert len(rebuilt) == 1 and rebuilt != cached
+
+    def test_report_cache_evicts_least_recently_used(self, client, sample_transaction_data, report_cache_dir, monkeypatch):
+        from config import settings
+
+        client.post('/transactions/', json=sample_transaction_data)
+        url = '/transactions/reports/download?file_type=csv&start_date={}&end_date=2024-01-31'
+
+        client.get(url.format('2024-01-01'))
+        size = next(report_cache_dir.glob('csv_*.csv')).stat().st_size
+        # Room for two artifacts of this size
+        monkeypatch.setattr(settings, 'report_cache_max_bytes', 2 * size)
+
+        client.get(url.format('2024-01-02'))
+        client.get(url.format('2024-01-01'))  # cache hit marks it as recently used
+        client.get(url.format('2024-01-03'))
+
+        ranges = sorted(path.name.split('_')[1] for path in report_cache_dir.glob('csv_*.csv'))
+        assert ranges == ['2024-01-01', '2024-01-03']
+
+    def test_report_job_lifecycle(self, client, sample_transaction_data):
+        import time
+        client.post('/transactions/', json=sample_transaction_data)
+
+        resp = client.post('/transactions/reports/jobs', json={'file_type': 'pdf'})
+        assert resp.status_code == status.HTTP_202_ACCEPTED
+        job = resp.json()
+        assert job['status'] in ('queued', 'running', 'done')
+
+        deadline = time.monotonic() + 30
+        while job['status'] in ('queued', 'running') and time.monotonic() < deadline:
+            time.sleep(0.05)
+            job = client.get(f"/transactions/reports/jobs/{job['id']}").json()
+        assert job['status'] == 'done'
+
+        resp = client.get(f"/transactions/reports/jobs/{job['id']}/download")
+        assert resp.status_code == status.HTTP_200_OK
+        assert resp.content.startswith(b'%PDF')
+
+        # Same range and unchanged data: done immediately from the cache
+        again = client.post('/transactions/reports/jobs', json={'file_type': 'pdf'}).json()
+        assert again['status'] == 'done'
+
+    def test_report_job_errors(self, client):
+        assert client.get('/transactions/reports/jobs/missing').status_code == status.HTTP_404_NOT_FOUND
+        resp = client.post('/transactions/reports/jobs', json={'file_type': 'csv', 'start_date': '../x'})
+        assert resp.status_code == status.HTTP_400_BAD_REQUEST
+
+
+class TestReportPdf:
+    def test_pdf_has_summary_and_paged_rows(self, db_session):
+        from sqlalchemy import insert
+        from models import Category, Transaction
+        from services.report_service import build_pdf
+
+        category = Category(name='Food', is_income=False)
+        db_session.add(category)
+        db_session.commit()
+        db_session.execute(insert(Transaction), [
+            {'amount': 1.5, 'category_id': category.id, 'description': 'x' * 500, 'is_income': False, 'date': '2024-01-15'}
+            for _ in range(200)
+        ])
+        db_session.commit()
+
+        pdf = build_pdf(db_session, None, None)
+        assert pdf.startswith(b'%PDF')
+        # Summary page plus 200 rows at 38 rows per page
+        assert b'/Count 7' in pdf
@@ -1,6 +1,8 @@
 import pytest
 from services.transaction_service import TransactionService
-from schemas import TransactionCreate, TransactionUpdate
+from services.category_service import CategoryService
+from models import Transaction
+from schemas import TransactionCreate, TransactionUpdate, CategoryCreate, CategoryUpdate
 from fastapi import HTTPException
 
 
@@ -95,3 +97,198 @@ class TestTransactionService:
             TransactionService.delete_transaction(db_session, 999)
         assert exc_info.value.status_code == 404
 
+    
+    def test_get_report_totals(self, db_session, sample_transaction_data, sample_income_data):
+        """Test that report totals are computed without loading rows."""
+        TransactionService.create_transaction(db_session, TransactionCreate(**sample_transaction_data))
+        TransactionService.create_transaction(db_session, TransactionCreate(**sample_income_data))
+        
+        totals = TransactionService.get_report_totals(db_session)
+        assert totals["total_income"] == sample_income_data["amount"]
+        assert totals["total_expense"] == sample_transaction_data["amount"]
+        assert totals["count"] == 2
+        
+        agg = TransactionService.get_transactions_aggregate(db_session)
+        assert "transactions" not in agg
+        agg = TransactionService.get_transactions_aggregate(db_session, include_transactions=True)
+        assert len(agg["transactions"]) == 2
+    
+    def test_iter_transaction_rows_batches(self, db_session, sample_transaction_data):
+        """Test that export rows are streamed in bounded batches."""
+        for i in range(5):
+            data = sample_transaction_data.copy()
+            data["description"] = f"Transaction {i}"
+            TransactionService.create_transaction(db_session, TransactionCreate(**data))
+        
+        batches = list(TransactionService.iter_transaction_rows(db_session, batch_size=2))
+        assert [len(b) for b in batches] == [2, 2, 1]
+        rows = [row for batch in batches for row in batch]
+        assert [row[4] for row in rows] == [f"Transaction {i}" for i in range(4, -1, -1)]
+        assert all(row[3] == "Food" for row in rows)
+
+
+class TestVersionService:
+    """Tests for data version tracking."""
+
+    def test_writes_bump_versions(self, db_session, sample_transaction_data):
+        from sqlalchemy import update
+        from models import Transaction
+        from services.version_service import VersionService
+
+        before = VersionService.get_marker(db_session, 'transactions')
+        category = CategoryService.create_category(db_session, CategoryCreate(name="Food", is_income=False))
+        transaction = TransactionService.create_transaction(
+            db_session, TransactionCreate(**{**sample_transaction_data, 'category_id': category.id})
+        )
+        after_create = VersionService.get_marker(db_session, 'transactions')
+        assert after_create != before
+
+        # Bulk statements bypass the unit of work but still count as writes
+        db_session.execute(update(Transaction).where(Transaction.id == transaction.id).values(description="x"))
+        db_session.commit()
+        assert VersionService.get_marker(db_session, 'transactions') != after_create
+
+        # Reads leave the version alone
+        marker = VersionService.get_marker(db_session, 'transactions', 'categories')
+        TransactionService.get_transactions(db_session)
+        db_session.commit()
+        assert VersionService.get_marker(db_session, 'transactions', 'categories') == marker
+
+
+class TestCategoryCache:
+    """Tests for the in-process category cache."""
+
+    def test_write_path_resolves_categories_without_queries(self, db_session, sample_transaction_data):
+        from sqlalchemy import event
+        from services.category_service import CategoryCache
+
+        category = CategoryService.create_category(db_session, CategoryCreate(name="Food", is_income=False))
+        CategoryCache.load(db_session)
+
+        statements = []
+
+        def count_statement(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        engine = db_session.get_bind()
+        event.listen(engine, "before_cursor_execute", count_statement)
+        try:
+            TransactionService.create_transaction(
+                db_session, TransactionCreate(**{**sample_transaction_data, 'category_id': category.id})
+            )
+            TransactionService.create_transaction(db_session, TransactionCreate(**sample_transaction_data))
+        finally:
+            event.remove(engine, "before_cursor_execute", count_statement)
+        assert not [s for s in statements if "FROM categories" in s]
+
+    def test_category_writes_invalidate_cache(self, db_session):
+        from services.category_service import CategoryCache
+
+        assert CategoryCache.get_by_name(db_session, "Travel") is None
+        category = CategoryService.create_category(db_session, CategoryCreate(name="Travel", is_income=False))
+        assert CategoryCache.get_by_name(db_session, "Travel").id == category.id
+
+        CategoryService.update_category(db_session, category.id, CategoryUpdate(name="Trips"))
+        assert CategoryCache.get_by_name(db_session, "Travel") is None
+        assert CategoryCache.get_by_id(db_session, category.id).name == "Trips"
+
+        CategoryService.delete_category(db_session, category.id)
+        assert CategoryCache.get_by_id(db_session, category.id) is None
+        with pytest.raises(HTTPException) as exc_info:
+            TransactionService.create_transaction(db_session, TransactionCreate(
+                amount=1, category_id=category.id, is_income=False, date="2024-01-01"
+            ))
+        assert exc_info.value.status_code == 404
+
+
+    def test_bulk_paths_see_categories_created_by_another_worker(self, tmp_path):
+        import io
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+        from database import Base
+        from models import Category
+        from schemas import TransactionBatchRequest
+        from services.category_service import CategoryCache
+        from services.import_service import ImportService
+
+        # Two engines on one file stand in for two worker processes
+        url = f"sqlite:///{tmp_path / 'shared.db'}"
+        engine_a, engine_b = create_engine(url), create_engine(url)
+        Base.metadata.create_all(bind=engine_a)
+        db_a, db_b = sessionmaker(bind=engine_a)(), sessionmaker(bind=engine_b)()
+        try:
+            CategoryCache.load(db_b)
+            travel = CategoryService.create_category(db_a, CategoryCreate(name="Travel", is_income=False))
+
+            result = TransactionService.apply_batch(db_b, TransactionBatchRequest(create=[
+                {"amount": 10, "category_id": travel.id, "is_income": False, "date": "2024-01-01"}
+            ]))
+            assert result["succeeded"] == 1
+
+            csv_data = b"amount,category,is_income,date\n12.5,Travel,false,2024-01-02\n"
+            result = ImportService.import_transactions(db_b, ImportService.iter_records(io.BytesIO(csv_data), "csv"))
+            assert result["inserted"] == 1
+            assert db_b.query(Category).filter(Category.name == "Travel").count() == 1
+        finally:
+            db_a.close()
+            db_b.close()
+            engine_a.dispose()
+            engine_b.dispose()
+
+
+class TestRollupService:
+    """Tests for the daily_totals rollup."""
+
+    @staticmethod
+    def rollup_rows(db_session):
+        from models import DailyTotal
+        return sorted(
+            (r.date, r.category_id, r.is_income, r.total_cents, r.count) for r in db_session.query(DailyTotal)
+        )
+
+    def test_writes_keep_rollup_equal_to_rebuild(self, db_session, sample_transaction_data, sample_income_data):
+        import io
+        from schemas import TransactionBatchRequest
+        from services.import_service import ImportService
+        from services.rollup_service import RollupService
+
+        first = TransactionService.create_transaction(db_session, TransactionCreate(**sample_transaction_data))
+        second = TransactionService.create_transaction(db_session, TransactionCreate(**sample_income_data))
+        third = TransactionService.create_transaction(
+            db_session, TransactionCreate(**{**sample_transaction_data, 'amount': 0.1})
+        )
+        TransactionService.update_transaction(db_session, first.id, TransactionUpdate(amount=12.34, date="2024-02-01"))
+        TransactionService.delete_transaction(db_session, third.id)
+        TransactionService.apply_batch(db_session, TransactionBatchRequest(
+            create=[TransactionCreate(**{**sample_income_data, 'date': "2024-03-01"})],
+            update=[
+                {'id': second.id, 'is_income': False},
+                {'id': second.id, 'amount': 7},
+            ],
+            delete=[first.id],
+        ))
+        csv_data = b"amount,category,is_income,date\n2.5,Food,false,2024-01-15\n3,Rent,false,2024-01-16\n"
+        ImportService.import_transactions(db_session, ImportService.iter_records(io.BytesIO(csv_data), 'csv'))
+
+        maintained = self.rollup_rows(db_session)
+        RollupService.rebuild(db_session)
+        db_session.commit()
+        assert maintained == self.rollup_rows(db_session)
+
+        totals = TransactionService.get_report_totals(db_session)
+        assert totals['count'] == db_session.query(Transaction).count()
+        assert totals['total_expense'] == round(sum(
+            t.amount for t in db_session.query(Transaction).filter(Transaction.is_income == False)
+        ), 2)
+
+    def test_rebuild_if_missing(self, db_session, sample_transaction_data):
+        from models import DailyTotal
+        from services.rollup_service import RollupService
+
+        TransactionService.create_transaction(db_session, TransactionCreate(**sample_transaction_data))
+        assert RollupService.rebuild_if_missing(db_session) is None
+
+        db_session.query(DailyTotal).delete()
+        db_session.commit()
+        assert RollupService.rebuild_if_missing(db_session) == 1
+        assert TransactionService.get_report_totals(db_session)['count'] == 1
@@ -0,0 +1,71 @@
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from slow_queries import SlowQueryLog, slow_query_log
+
+
+@pytest.fixture
+def logged_engine(db_session):
+    """Log every statement on the test engine to the application slow-query log."""
+    engine = db_session.get_bind()
+    slow_query_log.clear()
+    slow_query_log.attach(engine, threshold_ms=0)
+    yield engine
+    slow_query_log.detach(engine)
+    slow_query_log.clear()
+
+
+class TestSlowQueryLog:
+    """Tests for the slow-query log and its debug endpoint."""
+
+    def test_records_statement_parameters_and_plan(self, client, logged_engine, sample_transaction_data):
+        """Statements over the threshold are logged with their SQLite query plan."""
+        client.post("/transactions/", json=sample_transaction_data)
+        slow_query_log.clear()
+
+        client.get("/transactions/", params={"is_income": "false", "start_date": "2024-01-01"})
+
+        entries = client.get("/debug/slow-queries").json()
+        assert entries["enabled"] is True
+        assert entries["threshold_ms"] == 0
+        selects = [e for e in entries["entries"] if "FROM transactions" in e["statement"]]
+        assert selects
+        entry = selects[0]
+        assert entry["duration_ms"] >= 0
+        assert entry["parameters"]
+        assert any("transactions" in line for line in entry["plan"])
+
+    def test_threshold_and_ring_buffer(self, logged_engine):
+        """Fast statements are skipped and only the newest entries are kept."""
+        log = SlowQueryLog(size=3)
+        log.attach(logged_engine, threshold_ms=60_000)
+        try:
+            with logged_engine.connect() as conn:
+                conn.exec_driver_sql("SELECT 1")
+            assert log.entries() == []
+
+            log.attach(logged_engine, threshold_ms=0)
+            with logged_engine.connect() as conn:
+                for i in range(5):
+                    conn.exec_driver_sql(f"SELECT {i}")
+            statements = [entry["statement"] for entry in log.entries()]
+            assert statements == ["SELECT 4", "SELECT 3", "SELECT 2"]
+        finally:
+            log.detach(logged_engine)
+
+    def test_failed_statements_leave_no_state_on_connection(self, logged_engine):
+        """A statement that raises is not logged and leaves nothing on the pooled connection."""
+        with logged_engine.connect() as conn:
+            snapshot = lambda: {key: repr(value) for key, value in conn.info.items()}
+            info = snapshot()
+            with pytest.raises(OperationalError):
+                conn.exec_driver_sql("SELECT * FROM no_such_table")
+            assert snapshot() == info
+            conn.exec_driver_sql("SELECT 1")
+        assert [entry["statement"] for entry in slow_query_log.entries()] == ["SELECT 1"]
+
+    def test_clear_endpoint(self, client, logged_engine):
+        """DELETE empties the log."""
+        client.get("/categories/")
+        assert client.delete("/debug/slow-queries").status_code == 204
+        assert client.get("/debug/slow-queries").json()["entries"] == []
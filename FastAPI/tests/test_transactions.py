@@ -1,5 +1,7 @@
 import pytest
 from fastapi import status
+from sqlalchemy import event
+from schemas import TransactionResponse
 
 
 class TestTransactionEndpoints:
@@ -32,6 +34,17 @@ class TestTransactionEndpoints:
         response = client.post("/transactions/", json=invalid_data)
         assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
     
+    def test_amount_must_fit_cents_storage(self, client, sample_transaction_data):
+        """Test that amounts cents storage cannot hold exactly are rejected."""
+        for amount in (0.001, 12.345, 1e17):
+            response = client.post("/transactions/", json={**sample_transaction_data, "amount": amount})
+            assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY, amount
+        
+        created = client.post("/transactions/", json={**sample_transaction_data, "amount": 0.01}).json()
+        assert created["amount"] == 0.01
+        response = client.put(f"/transactions/{created['id']}", json={"amount": 0.005})
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    
     def test_create_transaction_invalid_date(self, client, sample_transaction_data):
         """Test creating a transaction with invalid date format."""
         invalid_data = sample_transaction_data.copy()
@@ -39,6 +52,26 @@ class TestTransactionEndpoints:
         response = client.post("/transactions/", json=invalid_data)
         assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
     
+    def test_create_transaction_unpadded_date(self, client, sample_transaction_data):
+        """Test that dates without leading zeros are stored zero-padded."""
+        data = {**sample_transaction_data, "date": "2024-1-5"}
+        response = client.post("/transactions/", json=data)
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.json()["date"] == "2024-01-05"
+        
+        batch = client.post("/transactions/batch", json={"create": [data]})
+        assert batch.status_code == status.HTTP_200_OK
+        assert batch.json()["succeeded"] == 1
+        
+        listed = client.get("/transactions/", params={"start_date": "2024-1-5", "end_date": "2024-1-5"})
+        assert [t["date"] for t in listed.json()] == ["2024-01-05", "2024-01-05"]
+    
+    def test_date_filters_must_be_yyyy_mm_dd(self, client):
+        """Test that other ISO 8601 forms are rejected as range bounds."""
+        for value in ("20240101", "2024-W03-1", "2024-01-01T00:00"):
+            response = client.get("/transactions/", params={"start_date": value})
+            assert response.status_code == status.HTTP_400_BAD_REQUEST, value
+    
     def test_create_transaction_missing_fields(self, client):
         """Test creating a transaction with missing required fields."""
         incomplete_data = {"amount": 100.0}
@@ -170,3 +203,224 @@ class TestTransactionEndpoints:
         response = client.delete("/transactions/999")
         assert response.status_code == status.HTTP_404_NOT_FOUND
 
+    
+    def test_get_transactions_with_cursor(self, client, sample_transaction_data):
+        """Test keyset pagination through the X-Next-Cursor header."""
+        for i in range(5):
+            data = sample_transaction_data.copy()
+            data["description"] = f"Transaction {i}"
+            client.post("/transactions/", json=data)
+        
+        seen = []
+        response = client.get("/transactions/?limit=2")
+        while True:
+            assert response.status_code == status.HTTP_200_OK
+            seen.extend(t["id"] for t in response.json())
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+            response = client.get(f"/transactions/?limit=2&cursor={cursor}")
+        
+        assert seen == sorted(seen, reverse=True)
+        assert len(seen) == len(set(seen)) == 5
+    
+    def test_get_transactions_invalid_cursor(self, client):
+        """Test that a malformed cursor is rejected."""
+        response = client.get("/transactions/?cursor=not-a-cursor")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+    
+    def test_search_transactions(self, client, sample_transaction_data, sample_income_data):
+        """Test ranked full-text search with filters and keyset pagination."""
+        descriptions = ["Coffee beans", "Café au lait", "Coffee with coffee cake", "Rent", "coffee shop"]
+        ids = {}
+        for description in descriptions:
+            data = dict(sample_transaction_data, description=description)
+            ids[description] = client.post("/transactions/", json=data).json()["id"]
+        client.post("/transactions/", json=dict(sample_income_data, description="Coffee refund"))
+
+        # Prefix match on the last word; the denser match ranks first
+        response = client.get("/transactions/search", params={"q": "cof", "is_income": "false"})
+        assert response.status_code == status.HTTP_200_OK
+        found = [t["id"] for t in response.json()]
+        assert found[0] == ids["Coffee with coffee cake"]
+        assert sorted(found) == sorted(ids[d] for d in ("Coffee beans", "Coffee with coffee cake", "coffee shop"))
+        assert set(response.json()[0]) == set(TransactionResponse.model_fields)
+
+        # Accents are ignored, and updates and deletes are reflected
+        assert [t["id"] for t in client.get("/transactions/search?q=cafe").json()] == [ids["Café au lait"]]
+        client.put(f"/transactions/{ids['Rent']}", json={"description": "Rent and coffee"})
+        client.delete(f"/transactions/{ids['Coffee beans']}")
+
+        seen = []
+        response = client.get("/transactions/search", params={"q": "coffee", "limit": 2})
+        while True:
+            seen.extend(t["id"] for t in response.json())
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+            response = client.get("/transactions/search", params={"q": "coffee", "limit": 2, "cursor": cursor})
+        assert len(seen) == len(set(seen)) == 4
+        assert ids["Rent"] in seen and ids["Coffee beans"] not in seen
+
+    def test_search_rejects_bad_input(self, client):
+        """Test that FTS syntax is searched literally and bad cursors are rejected."""
+        assert client.get("/transactions/search", params={"q": '"coffee" OR (rent'}).json() == []
+        assert client.get("/transactions/search", params={"q": "!!!"}).status_code == status.HTTP_400_BAD_REQUEST
+        list_cursor = client.get("/transactions/search", params={"q": "x", "cursor": "eyJpZCI6NX0"})
+        assert list_cursor.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_list_and_export_query_count_is_bounded(self, client, db_session, sample_transaction_data):
+        """Test that category names are loaded with the rows, not once per row."""
+        for name in ["Food", "Transport", "Shopping", "Bills", "Gift"]:
+            data = sample_transaction_data.copy()
+            data["category"] = name
+            client.post("/transactions/", json=data)
+        db_session.expire_all()
+        
+        statements = []
+        def count_statement(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        
+        engine = db_session.get_bind()
+        event.listen(engine, "before_cursor_execute", count_statement)
+        try:
+            response = client.get("/transactions/")
+            assert response.status_code == status.HTTP_200_OK
+            assert {t["category"] for t in response.json()} == {"Food", "Transport", "Shopping", "Bills", "Gift"}
+            # One query for the page, plus the data version lookup for the ETag
+            assert len([s for s in statements if "data_versions" not in s]) == 1
+            
+            statements.clear()
+            response = client.get("/transactions/reports/download?file_type=csv")
+            assert response.status_code == status.HTTP_200_OK
+            assert len([s for s in statements if "FROM categories" in s and "JOIN" not in s]) == 0
+        finally:
+            event.remove(engine, "before_cursor_execute", count_statement)
+    
+    def test_batch_create_update_delete(self, client, sample_transaction_data, sample_income_data):
+        """Test applying creates, updates and deletes in one batch."""
+        first = client.post("/transactions/", json=sample_transaction_data).json()
+        second = client.post("/transactions/", json=sample_transaction_data).json()
+        salary_id = client.post("/transactions/", json=sample_income_data).json()["category_id"]
+        
+        batch = {
+            "create": [
+                {**sample_transaction_data, "category": "Transport", "amount": 3.5},
+                {**sample_transaction_data, "category": None, "category_id": 999},
+            ],
+            "update": [
+                {"id": first["id"], "category_id": salary_id, "is_income": True},
+                {"id": second["id"], "category_id": salary_id, "is_income": True},
+                {"id": 999, "amount": 1.0},
+            ],
+            "delete": [999],
+        }
+        response = client.post("/transactions/batch", json=batch)
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["succeeded"] == 3
+        assert data["failed"] == 3
+        results = {(r["op"], r["index"]): r for r in data["results"]}
+        assert results[("create", 0)]["ok"] is True
+        assert results[("create", 1)]["detail"] == "Category not found"
+        assert results[("update", 2)]["detail"] == "Transaction not found"
+        
+        created = client.get(f"/transactions/{results[('create', 0)]['id']}").json()
+        assert created["category"] == "Transport"
+        for transaction_id in (first["id"], second["id"]):
+            updated = client.get(f"/transactions/{transaction_id}").json()
+            assert updated["category"] == "Salary"
+            assert updated["is_income"] is True
+        
+        response = client.post("/transactions/batch", json={"delete": [first["id"], second["id"]]})
+        assert response.json()["succeeded"] == 2
+        assert client.get(f"/transactions/{first['id']}").status_code == status.HTTP_404_NOT_FOUND
+    
+    def test_batch_updates_apply_in_order(self, client, sample_transaction_data):
+        """Test that repeated updates to one id apply in item order, with results in index order."""
+        created = client.post("/transactions/", json=sample_transaction_data).json()
+        batch = {"update": [
+            {"id": created["id"], "amount": 5},
+            {"id": created["id"], "amount": 7, "description": "Dinner"},
+            {"id": created["id"], "amount": 5},
+        ]}
+        data = client.post("/transactions/batch", json=batch).json()
+        assert [r["index"] for r in data["results"]] == [0, 1, 2]
+        updated = client.get(f"/transactions/{created['id']}").json()
+        assert (updated["amount"], updated["description"]) == (5, "Dinner")
+        totals = client.get("/transactions/reports/aggregate").json()
+        assert (totals["total_expense"], totals["count"]) == (5, 1)
+    
+    def test_batch_update_rejects_nulls_per_item(self, client, sample_transaction_data):
+        """Test that nulls for required fields fail their item, not the whole batch."""
+        created = client.post("/transactions/", json=sample_transaction_data).json()
+        batch = {"update": [
+            {"id": created["id"], "amount": None},
+            {"id": created["id"], "date": None},
+            {"id": created["id"], "is_income": None},
+            {"id": created["id"], "description": None},
+        ]}
+        response = client.post("/transactions/batch", json=batch)
+        assert response.status_code == status.HTTP_200_OK
+        assert [r["detail"] for r in response.json()["results"]] == [
+            "amount cannot be null", "date cannot be null", "is_income cannot be null", None
+        ]
+        updated = client.get(f"/transactions/{created['id']}").json()
+        assert updated["description"] is None
+        assert updated["amount"] == sample_transaction_data["amount"]
+    
+    def test_conditional_get_returns_304_until_data_changes(self, client, sample_transaction_data):
+        """Test ETag/If-None-Match handling on read endpoints."""
+        created = client.post("/transactions/", json=sample_transaction_data).json()
+        url = f"/transactions/{created['id']}"
+        
+        response = client.get(url)
+        etag = response.headers["etag"]
+        assert response.headers["last-modified"]
+        assert client.get(url, headers={"If-None-Match": etag}).status_code == status.HTTP_304_NOT_MODIFIED
+        assert client.get(
+            "/transactions/reports/aggregate", headers={"If-None-Match": etag}
+        ).status_code == status.HTTP_200_OK
+        
+        client.put(url, json={"description": "Dinner"})
+        response = client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["description"] == "Dinner"
+        assert response.headers["etag"] != etag
+        
+        categories = client.get("/categories/")
+        assert client.get(
+            "/categories/", headers={"If-None-Match": categories.headers["etag"]}
+        ).status_code == status.HTTP_304_NOT_MODIFIED
+        assert client.get(
+            "/categories/", headers={"If-Modified-Since": categories.headers["last-modified"]}
+        ).status_code == status.HTTP_304_NOT_MODIFIED
+    
+    def test_conditional_get_on_missing_resource(self, client, sample_transaction_data):
+        """Test that `If-None-Match: *` does not turn a 404 into a 304."""
+        created = client.post("/transactions/", json=sample_transaction_data).json()
+        headers = {"If-None-Match": "*"}
+        assert client.get(f"/transactions/{created['id']}", headers=headers).status_code == status.HTTP_304_NOT_MODIFIED
+        assert client.get("/transactions/999", headers=headers).status_code == status.HTTP_404_NOT_FOUND
+        assert client.get("/categories/999", headers=headers).status_code == status.HTTP_404_NOT_FOUND
+    
+    def test_list_fast_path_matches_response_schema(self, client, sample_transaction_data, monkeypatch):
+        """Test the list endpoint's direct row serialization, with and without orjson."""
+        import serialization
+        for _ in range(30):
+            client.post("/transactions/", json=sample_transaction_data)
+        
+        response = client.get("/transactions/", headers={"Accept-Encoding": "gzip"})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"] == "application/json"
+        assert response.headers["content-encoding"] == "gzip"
+        data = response.json()
+        assert len(data) == 30
+        assert set(data[0]) == {"id", "amount", "category_id", "category", "description", "is_income", "date"}
+        assert data[0]["category"] == "Food" and data[0]["amount"] == 100.5 and data[0]["is_income"] is False
+        
+        single = client.get(f"/transactions/{data[0]['id']}").json()
+        assert single == data[0]
+        
+        monkeypatch.setattr(serialization, "orjson", None)
+        assert client.get("/transactions/").json() == data